@@ -0,0 +1,173 @@
+"""
+MultiHeadFusionHybrid network definition, with no training side effects.
+
+multihead_model.py is the Colab training script: importing it logs into
+Kaggle, mounts Drive, downloads datasets and trains. Inference and export
+code import the architecture from here instead. The backbones are built
+without pretrained weights unless asked, because the checkpoint overwrites
+them anyway, so building the model needs no network access.
+"""
+
+import pickle
+
+import torch
+from torch import nn
+from torchvision import models
+
+DATASET_TYPES = ("chest", "skin", "wound")
+# Used when a checkpoint's head shapes cannot be read
+DEFAULT_NUM_CLASSES = {"chest": 3, "skin": 22, "wound": 10}
+FEATURE_DIMS = {"chest": 2048, "skin": 1536, "wound": 1024}
+# make_head's last Linear sits at this index of the head Sequential
+HEAD_OUT_INDEX = 9
+
+
+def build_backbone(dataset_type, pretrained=False):
+    """
+    Feature extractor for one dataset type; outputs (N, FEATURE_DIMS[...], 1, 1).
+    """
+    if dataset_type == "chest":
+        weights = models.ResNet50_Weights.IMAGENET1K_V2 if pretrained else None
+        return nn.Sequential(*list(models.resnet50(weights=weights).children())[:-1])
+    if dataset_type == "skin":
+        weights = models.EfficientNet_B3_Weights.IMAGENET1K_V1 if pretrained else None
+        return nn.Sequential(*list(models.efficientnet_b3(weights=weights).children())[:-1])
+    if dataset_type == "wound":
+        weights = models.DenseNet121_Weights.IMAGENET1K_V1 if pretrained else None
+        return nn.Sequential(*list(models.densenet121(weights=weights).features), nn.AdaptiveAvgPool2d(1))
+    raise ValueError("dataset_type must be 'chest','skin','wound'")
+
+
+def make_head(in_dim, out_dim):
+    return nn.Sequential(
+        nn.Linear(in_dim, 512), nn.ReLU(inplace=True), nn.Dropout(0.4),
+        nn.Linear(512, 256), nn.ReLU(inplace=True), nn.Dropout(0.25),
+        nn.Linear(256, 128), nn.ReLU(inplace=True), nn.Dropout(0.2),
+        nn.Linear(128, out_dim)
+    )
+
+
+class MultiHeadFusionHybrid(nn.Module):
+    def __init__(self, chest_classes, skin_classes, wound_classes, pretrained=False):
+        super().__init__()
+        self.chest_backbone = build_backbone("chest", pretrained)
+        self.skin_backbone = build_backbone("skin", pretrained)
+        self.wound_backbone = build_backbone("wound", pretrained)
+
+        self.chest_head = make_head(FEATURE_DIMS["chest"], chest_classes)
+        self.skin_head = make_head(FEATURE_DIMS["skin"], skin_classes)
+        self.wound_head = make_head(FEATURE_DIMS["wound"], wound_classes)
+
+    def forward(self, x, dataset_type):
+        if dataset_type == "chest":
+            feat = self.chest_backbone(x).view(x.size(0), -1)
+            return self.chest_head(feat)
+        elif dataset_type == "skin":
+            feat = self.skin_backbone(x).view(x.size(0), -1)
+            return self.skin_head(feat)
+        elif dataset_type == "wound":
+            feat = self.wound_backbone(x).view(x.size(0), -1)
+            return self.wound_head(feat)
+        else:
+            raise ValueError("dataset_type must be 'chest','skin','wound'")
+
+
+class SingleHeadModel(nn.Module):
+    """
+    One backbone + head of MultiHeadFusionHybrid, for serving a single
+    dataset type without keeping the other two networks in memory.
+    """
+    def __init__(self, dataset_type, num_classes, pretrained=False):
+        super().__init__()
+        self.dataset_type = dataset_type
+        self.backbone = build_backbone(dataset_type, pretrained)
+        self.head = make_head(FEATURE_DIMS[dataset_type], num_classes)
+
+    def forward(self, x):
+        feat = self.backbone(x).view(x.size(0), -1)
+        return self.head(feat)
+
+
+def split_state_dict(state, dataset_type):
+    """
+    The SingleHeadModel state dict for one dataset type, taken from a full
+    MultiHeadFusionHybrid state dict.
+    """
+    prefixes = {f"{dataset_type}_backbone.": "backbone.", f"{dataset_type}_head.": "head."}
+    return {
+        new + key[len(old):]: value
+        for key, value in state.items()
+        for old, new in prefixes.items()
+        if key.startswith(old)
+    }
+
+
+# ------------------ Checkpoint loading ------------------
+
+class _ArchitectureUnpickler(pickle.Unpickler):
+    # The Colab script saved the whole module (torch.save(model, ...)), so the
+    # pickle refers to __main__.MultiHeadFusionHybrid; point it here.
+    def find_class(self, module, name):
+        if name == "MultiHeadFusionHybrid":
+            return MultiHeadFusionHybrid
+        return super().find_class(module, name)
+
+
+class _architecture_pickle:
+    Unpickler = _ArchitectureUnpickler
+    load = staticmethod(lambda f, **kw: _ArchitectureUnpickler(f, **kw).load())
+
+
+def load_state_dict(path, map_location="cpu"):
+    """
+    State dict from either checkpoint format: a plain state dict (or a dict
+    holding one under "state_dict"/"model") or a fully pickled module.
+    """
+    try:
+        obj = torch.load(path, map_location=map_location, weights_only=True)
+    except Exception:
+        # Full module pickle: only load checkpoints you trust
+        obj = torch.load(path, map_location=map_location, weights_only=False,
+                         pickle_module=_architecture_pickle)
+    if isinstance(obj, nn.Module):
+        return obj.state_dict()
+    if isinstance(obj, dict):
+        for key in ("state_dict", "model"):
+            if isinstance(obj.get(key), dict):
+                return obj[key]
+        return obj
+    raise TypeError(f"Unsupported checkpoint contents in {path}: {type(obj).__name__}")
+
+
+def num_classes_from_state(state):
+    """
+    Class count per dataset type, read from each head's output layer.
+    """
+    counts = {}
+    for dataset_type in DATASET_TYPES:
+        weight = state.get(f"{dataset_type}_head.{HEAD_OUT_INDEX}.weight")
+        counts[dataset_type] = weight.shape[0] if weight is not None else DEFAULT_NUM_CLASSES[dataset_type]
+    return counts
+
+
+def load_model(path, device="cpu"):
+    """
+    Builds MultiHeadFusionHybrid without pretrained downloads and loads the
+    checkpoint at `path` into it, in eval mode.
+    """
+    state = load_state_dict(path)
+    counts = num_classes_from_state(state)
+    model = MultiHeadFusionHybrid(counts["chest"], counts["skin"], counts["wound"], pretrained=False)
+    model.load_state_dict(state)
+    return model.to(device).eval()
+
+
+if __name__ == "__main__":
+    # Rewrite a pickled-module checkpoint as a plain state dict
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("checkpoint")
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+    torch.save(load_state_dict(args.checkpoint), args.out)
+    print(f"[i] Wrote state dict to {args.out}")
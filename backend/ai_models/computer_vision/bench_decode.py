@@ -0,0 +1,76 @@
+"""
+Benchmark: full decode + torchvision Compose vs. draft-mode decode.
+
+For each image, times the old path (Image.open().convert("RGB") at full
+resolution, then Resize/ToTensor/Normalize) and preprocess.decode_image +
+normalize_into. Also reports the size of the decoded pixel buffer each path
+holds, which is what dominates peak memory per request.
+
+Usage (from repo root):
+    python -m backend.ai_models.computer_vision.bench_decode photos/*.jpg --dataset-type skin
+"""
+
+import argparse
+import time
+
+import torch
+from PIL import Image
+from torchvision import transforms
+
+from backend.ai_models.computer_vision.preprocess import DATASET_MODES, IMAGE_SIZE, decode_image, normalize_into
+
+OLD_TRANSFORM = transforms.Compose([
+    transforms.Resize((IMAGE_SIZE, IMAGE_SIZE)),
+    transforms.ToTensor(),
+    transforms.Normalize([0.485, 0.456, 0.406], [0.229, 0.224, 0.225])
+])
+
+
+def old_path(path):
+    img = Image.open(path).convert("RGB")
+    decoded = img.size[0] * img.size[1] * len(img.getbands())
+    return OLD_TRANSFORM(img), decoded
+
+
+def new_path(path, dataset_type, out):
+    with Image.open(path) as img:
+        if img.format == "JPEG":
+            img.draft(DATASET_MODES[dataset_type], (IMAGE_SIZE, IMAGE_SIZE))
+        decoded = img.size[0] * img.size[1] * len(DATASET_MODES[dataset_type])
+    return normalize_into(decode_image(path, dataset_type), out), decoded
+
+
+def timed(fn, repeats):
+    fn()  # warmup
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return (time.perf_counter() - start) * 1000 / repeats, result
+
+
+def main(args):
+    out = torch.empty(3, IMAGE_SIZE, IMAGE_SIZE)
+    totals = {"old_ms": 0.0, "new_ms": 0.0, "old_mb": 0.0, "new_mb": 0.0}
+    for path in args.images:
+        old_ms, (_, old_bytes) = timed(lambda: old_path(path), args.repeats)
+        new_ms, (_, new_bytes) = timed(lambda: new_path(path, args.dataset_type, out), args.repeats)
+        totals["old_ms"] += old_ms
+        totals["new_ms"] += new_ms
+        totals["old_mb"] += old_bytes / 2**20
+        totals["new_mb"] += new_bytes / 2**20
+        print(f"{path}: old {old_ms:7.1f} ms / {old_bytes / 2**20:6.1f} MB | "
+              f"new {new_ms:6.1f} ms / {new_bytes / 2**20:5.2f} MB")
+
+    n = len(args.images)
+    if n:
+        print(f"\nmean: old {totals['old_ms'] / n:.1f} ms, {totals['old_mb'] / n:.1f} MB decoded | "
+              f"new {totals['new_ms'] / n:.1f} ms, {totals['new_mb'] / n:.2f} MB decoded | "
+              f"speedup x{totals['old_ms'] / max(totals['new_ms'], 1e-9):.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("images", nargs="+")
+    parser.add_argument("--dataset-type", choices=sorted(DATASET_MODES), default="skin")
+    parser.add_argument("--repeats", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,77 @@
+"""
+Benchmark: default eager vs. optimized eager (optimize.py) per CV head.
+
+Times batch-1 and batch-N forwards of each backbone+head, first as
+predict_image used to run it (NCHW, no_grad, default threads), then after
+optimize_model (channels-last, torch.compile or frozen TorchScript,
+inference_mode). Load-time cost of the optimized path is reported
+separately. Uses the split checkpoints when present, otherwise random
+weights; latency does not depend on the weight values.
+
+Usage (from repo root):
+    python -m backend.ai_models.computer_vision.bench_eager --threads 4 --batch-size 8
+"""
+
+import argparse
+import time
+
+import torch
+
+from backend.ai_models.computer_vision.architecture import DATASET_TYPES, DEFAULT_NUM_CLASSES, SingleHeadModel
+from backend.ai_models.computer_vision.head_cache import HEADS_DIR, load_head
+from backend.ai_models.computer_vision.optimize import configure_threads, example_batch, optimize_model
+
+
+def build(dataset_type):
+    try:
+        return load_head(dataset_type, HEADS_DIR)
+    except FileNotFoundError:
+        return SingleHeadModel(dataset_type, DEFAULT_NUM_CLASSES[dataset_type]).eval()
+
+
+def timed(model, x, repeats, grad_mode):
+    with grad_mode():
+        model(x)  # warmup
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model(x)
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2], timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+
+
+def main(args):
+    configure_threads(args.threads, args.interop_threads)
+    print(f"[i] torch {torch.__version__}, {torch.get_num_threads()} intra-op threads")
+    for dataset_type in args.dataset_types:
+        model = build(dataset_type)
+        rows = {}
+        for batch_size in (1, args.batch_size):
+            rows[("default", batch_size)] = timed(
+                model, example_batch(batch_size, channels_last=False), args.repeats, torch.no_grad)
+
+        started = time.perf_counter()
+        optimized = optimize_model(model, compile=not args.no_compile)
+        load_s = time.perf_counter() - started
+        for batch_size in (1, args.batch_size):
+            rows[("optimized", batch_size)] = timed(
+                optimized, example_batch(batch_size), args.repeats, torch.inference_mode)
+
+        print(f"\n{dataset_type} (optimize + warmup at load: {load_s:.1f}s)")
+        for batch_size in (1, args.batch_size):
+            base_p50, base_p95 = rows[("default", batch_size)]
+            opt_p50, opt_p95 = rows[("optimized", batch_size)]
+            print(f"  batch {batch_size:>2}: default p50 {base_p50:7.1f} ms p95 {base_p95:7.1f} ms | "
+                  f"optimized p50 {opt_p50:7.1f} ms p95 {opt_p95:7.1f} ms | x{base_p50 / opt_p50:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dataset-types", nargs="+", choices=DATASET_TYPES, default=list(DATASET_TYPES))
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=0, help="intra-op threads (0 = torch default)")
+    parser.add_argument("--interop-threads", type=int, default=0)
+    parser.add_argument("--no-compile", action="store_true", help="force the frozen TorchScript path")
+    main(parser.parse_args())
@@ -0,0 +1,206 @@
+"""
+Export CPU serving variants of each CV backbone+head.
+
+For every dataset type this writes, into --out-dir (CV_EXPORT_DIR):
+    <type>_ts.pt     TorchScript, traced and frozen (fp32)
+    <type>_int8.pt   FX static int8 quantization, calibrated on held-out
+                     images, saved as TorchScript
+    <type>.onnx      ONNX (fp32, dynamic batch), for ONNX Runtime
+Serve one with CV_RUNTIME=torchscript|int8|onnx (head_cache.py).
+
+Held-out images are read from --data-dir/<type>/<class>/*.jpg|png. Class
+folders named 0, 1, 2... are used as class indices; otherwise the sorted
+folder order is (as in training). The first --calib-size images (after a
+seeded shuffle) calibrate int8; the rest measure top-1 accuracy, agreement
+with the fp32 head, and batch-1 latency for every variant. The results go
+to report.json and report.md.
+
+Usage (from repo root):
+    python -m backend.ai_models.computer_vision.export_cv --data-dir holdout
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+import time
+from pathlib import Path
+
+import torch
+
+from backend.ai_models.computer_vision.architecture import DATASET_TYPES
+from backend.ai_models.computer_vision.head_cache import EXPORT_DIR, EXPORT_FILES, HEADS_DIR, load_exported, load_head
+from backend.ai_models.computer_vision.preprocess import IMAGE_SIZE, decode_image, normalize_into
+
+MODEL_PATH = Path("backend/ai_models/computer_vision/hybrid_multitask_model.pth")
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+
+
+# ------------------ Data ------------------
+
+def load_holdout(data_dir, dataset_type):
+    """
+    [(normalized image tensor, class index)] for one dataset type.
+    """
+    root = Path(data_dir) / dataset_type
+    if not root.is_dir():
+        return []
+    classes = sorted(d.name for d in root.iterdir() if d.is_dir())
+    numeric = all(c.isdigit() for c in classes)
+    items = []
+    for i, cls in enumerate(classes):
+        label = int(cls) if numeric else i
+        for f in sorted((root / cls).iterdir()):
+            if f.suffix.lower() in IMAGE_EXTS:
+                items.append((f, label))
+    random.Random(0).shuffle(items)
+    return [(normalize_into(decode_image(f, dataset_type), torch.empty(3, IMAGE_SIZE, IMAGE_SIZE)), label)
+            for f, label in items]
+
+
+def batches(samples, size=16):
+    for i in range(0, len(samples), size):
+        chunk = samples[i:i + size]
+        yield torch.stack([x for x, _ in chunk]), torch.tensor([y for _, y in chunk])
+
+
+# ------------------ Exporters ------------------
+
+def export_torchscript(model, example, path):
+    with torch.no_grad():
+        traced = torch.jit.freeze(torch.jit.trace(model, example))
+    traced.save(str(path))
+
+
+def export_int8(model, example, calib, path):
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+    engine = "x86" if "x86" in torch.backends.quantized.supported_engines else "fbgemm"
+    torch.backends.quantized.engine = engine
+    prepared = prepare_fx(copy.deepcopy(model).eval(), get_default_qconfig_mapping(engine), (example,))
+    with torch.no_grad():
+        for x, _ in batches(calib):
+            prepared(x)
+    quantized = convert_fx(prepared)
+    export_torchscript(quantized, example, path)
+
+
+def export_onnx(model, example, path, opset=17):
+    torch.onnx.export(
+        model, (example,), str(path),
+        input_names=["image"], output_names=["logits"],
+        dynamic_axes={"image": {0: "batch"}, "logits": {0: "batch"}},
+        opset_version=opset,
+    )
+
+
+EXPORTERS = {
+    "torchscript": lambda model, example, calib, path: export_torchscript(model, example, path),
+    "int8": export_int8,
+    "onnx": lambda model, example, calib, path: export_onnx(model, example, path),
+}
+
+
+# ------------------ Evaluation ------------------
+
+def evaluate(model, samples, reference=None, latency_samples=50):
+    """
+    Top-1 predictions, accuracy, agreement with `reference` predictions and
+    batch-1 latency percentiles.
+    """
+    preds, labels = [], []
+    with torch.no_grad():
+        for x, y in batches(samples):
+            preds += model(x).argmax(dim=1).tolist()
+            labels += y.tolist()
+        timings = []
+        for x, _ in samples[:latency_samples]:
+            start = time.perf_counter()
+            model(x.unsqueeze(0))
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    result = {
+        "accuracy": sum(p == y for p, y in zip(preds, labels)) / len(labels) if labels else None,
+        "latency_p50_ms": timings[len(timings) // 2] if timings else None,
+        "latency_p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))] if timings else None,
+    }
+    if reference is not None:
+        result["fp32_agreement"] = sum(p == r for p, r in zip(preds, reference)) / len(preds) if preds else None
+    return result, preds
+
+
+def export_head(dataset_type, args):
+    fp32 = load_head(dataset_type, args.heads_dir, args.model)
+    samples = load_holdout(args.data_dir, dataset_type)
+    if not samples:
+        print(f"[Warning] No held-out images for '{dataset_type}' in {args.data_dir}; skipping")
+        return None
+    calib, held_out = samples[:args.calib_size], samples[args.calib_size:]
+    if not held_out:
+        print(f"[Warning] '{dataset_type}': all images used for calibration; evaluating on them too")
+        held_out = calib
+    example = torch.stack([x for x, _ in calib[:2]])
+
+    fp32_result, fp32_preds = evaluate(fp32, held_out)
+    rows = {"fp32": {**fp32_result, "file_mb": None}}
+    for variant in args.variants:
+        path = Path(args.out_dir) / EXPORT_FILES[variant].format(dataset_type)
+        try:
+            EXPORTERS[variant](fp32, example, calib, path)
+            # Measure exactly what head_cache.py will serve
+            result, _ = evaluate(load_exported(dataset_type, variant, args.out_dir), held_out, fp32_preds)
+            rows[variant] = {**result, "file_mb": os.path.getsize(path) / 2**20}
+        except Exception as e:
+            print(f"[Warning] {dataset_type}/{variant} export failed: {e}")
+            rows[variant] = {"error": str(e)}
+    return {"calibration_images": len(calib), "eval_images": len(held_out), "variants": rows}
+
+
+def write_report(report, out_dir):
+    with open(Path(out_dir) / "report.json", "w") as f:
+        json.dump(report, f, indent=2)
+
+    def fmt(v, spec):
+        return format(v, spec) if isinstance(v, (int, float)) else "-"
+
+    lines = ["| head | variant | accuracy | fp32 agreement | p50 ms | p95 ms | file MB |",
+             "|---|---|---|---|---|---|---|"]
+    for dataset_type, head in report.items():
+        for variant, r in head["variants"].items():
+            if "error" in r:
+                lines.append(f"| {dataset_type} | {variant} | failed: {r['error'][:60]} | | | | |")
+                continue
+            lines.append(f"| {dataset_type} | {variant} | {fmt(r['accuracy'], '.4f')} | "
+                         f"{fmt(r.get('fp32_agreement'), '.4f')} | {fmt(r['latency_p50_ms'], '.1f')} | "
+                         f"{fmt(r['latency_p95_ms'], '.1f')} | {fmt(r['file_mb'], '.1f')} |")
+    table = "\n".join(lines)
+    with open(Path(out_dir) / "report.md", "w") as f:
+        f.write(table + "\n")
+    print(table)
+
+
+def main(args):
+    torch.set_num_threads(args.threads)
+    os.makedirs(args.out_dir, exist_ok=True)
+    report = {}
+    for dataset_type in args.dataset_types:
+        result = export_head(dataset_type, args)
+        if result is not None:
+            report[dataset_type] = result
+    if report:
+        write_report(report, args.out_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data-dir", type=str, required=True, help="held-out images, <type>/<class>/*.jpg")
+    parser.add_argument("--heads-dir", type=str, default=str(HEADS_DIR))
+    parser.add_argument("--model", type=str, default=str(MODEL_PATH))
+    parser.add_argument("--out-dir", type=str, default=str(EXPORT_DIR))
+    parser.add_argument("--dataset-types", nargs="+", choices=DATASET_TYPES, default=list(DATASET_TYPES))
+    parser.add_argument("--variants", nargs="+", choices=sorted(EXPORTERS), default=["torchscript", "int8", "onnx"])
+    parser.add_argument("--calib-size", type=int, default=128)
+    parser.add_argument("--threads", type=int, default=max(1, os.cpu_count() or 1))
+    main(parser.parse_args())
@@ -0,0 +1,187 @@
+"""
+On-demand loading of the CV backbone+head pairs.
+
+predict_image only ever runs one of the three networks per request, chosen
+by dataset_type. HeadCache loads each SingleHeadModel the first time it is
+needed, keeps recently used ones resident, and evicts the least recently
+used ones when the loaded weights would exceed the memory budget.
+
+Config:
+    CV_HEADS_DIR         directory written by split_checkpoint.py
+    CV_MEMORY_BUDGET_MB  max MB of resident weights (0 = no limit)
+    CV_PRELOAD_HEADS     comma-separated dataset types to load at startup
+    CV_RUNTIME           eager | torchscript | int8 | onnx (see export_cv.py)
+    CV_EXPORT_DIR        directory written by export_cv.py
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import torch
+
+from backend.ai_models.computer_vision.architecture import (
+    DATASET_TYPES, SingleHeadModel, load_state_dict, num_classes_from_state, split_state_dict,
+)
+
+HEADS_DIR = Path(os.getenv("CV_HEADS_DIR", "backend/ai_models/computer_vision/heads"))
+CV_MEMORY_BUDGET_MB = float(os.getenv("CV_MEMORY_BUDGET_MB", "0"))
+CV_PRELOAD_HEADS = [t.strip() for t in os.getenv("CV_PRELOAD_HEADS", "").split(",") if t.strip()]
+CV_RUNTIME = os.getenv("CV_RUNTIME", "eager").lower()
+EXPORT_DIR = Path(os.getenv("CV_EXPORT_DIR", "backend/ai_models/computer_vision/exported"))
+# File name per exported variant, formatted with the dataset type
+EXPORT_FILES = {"torchscript": "{}_ts.pt", "int8": "{}_int8.pt", "onnx": "{}.onnx"}
+CV_RUNTIMES = ("eager", *EXPORT_FILES)
+
+
+class OnnxHead:
+    """
+    ONNX Runtime session with the call signature of a SingleHeadModel.
+    """
+    def __init__(self, path):
+        import onnxruntime as ort
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(str(path), opts, providers=["CPUExecutionProvider"])
+
+    def __call__(self, x):
+        return torch.from_numpy(self.session.run(None, {"image": x.cpu().numpy()})[0])
+
+    def to(self, device):
+        return self
+
+    def eval(self):
+        return self
+
+
+def model_bytes(model):
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+def load_head(dataset_type, heads_dir=HEADS_DIR, full_checkpoint=None):
+    """
+    fp32 SingleHeadModel for dataset_type, from its split file or, failing
+    that, cut out of the full checkpoint.
+    """
+    split_path = Path(heads_dir) / f"{dataset_type}.pth"
+    if split_path.exists():
+        ckpt = torch.load(split_path, map_location="cpu", weights_only=True)
+        num_classes, state = ckpt["num_classes"], ckpt["state_dict"]
+    elif full_checkpoint is not None and Path(full_checkpoint).exists():
+        print(f"[Warning] No split checkpoint for '{dataset_type}' in {heads_dir}; "
+              f"reading {full_checkpoint} (run split_checkpoint.py)")
+        full = load_state_dict(full_checkpoint)
+        num_classes = num_classes_from_state(full)[dataset_type]
+        state = split_state_dict(full, dataset_type)
+        del full
+    else:
+        raise FileNotFoundError(f"No checkpoint for '{dataset_type}' in {heads_dir}")
+
+    model = SingleHeadModel(dataset_type, num_classes, pretrained=False)
+    model.load_state_dict(state)
+    return model.eval()
+
+
+def load_exported(dataset_type, runtime, export_dir=EXPORT_DIR):
+    """
+    The export_cv.py variant of a head, or None if it has not been exported.
+    """
+    path = Path(export_dir) / EXPORT_FILES[runtime].format(dataset_type)
+    if not path.exists():
+        return None
+    if runtime == "onnx":
+        return OnnxHead(path)
+    return torch.jit.load(str(path), map_location="cpu").eval()
+
+
+class HeadCache:
+    def __init__(self, heads_dir=HEADS_DIR, full_checkpoint=None, budget_mb=CV_MEMORY_BUDGET_MB, device="cpu",
+                 runtime=CV_RUNTIME, export_dir=EXPORT_DIR, prepare=None):
+        if runtime not in CV_RUNTIMES:
+            raise ValueError(f"CV runtime must be one of {CV_RUNTIMES}, got '{runtime}'")
+        self.runtime = runtime
+        self.export_dir = Path(export_dir)
+        self.heads_dir = Path(heads_dir)
+        # Used for heads that have no split file yet
+        self.full_checkpoint = Path(full_checkpoint) if full_checkpoint else None
+        self.budget_bytes = int(budget_mb * 2**20)
+        self.device = device
+        # Optional transform applied to eager heads after loading (optimize.py)
+        self.prepare = prepare
+
+        self._models = OrderedDict()  # dataset_type -> model, least recently used first
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "loads": 0, "evictions": 0}
+        self._load_seconds = {}
+
+    # ------------------ Loading ------------------
+
+    def _load(self, dataset_type):
+        """
+        (model, resident bytes). Exported variants are CPU-only and are
+        sized by their file, since TorchScript hides packed int8 weights.
+        """
+        if self.runtime != "eager":
+            model = load_exported(dataset_type, self.runtime, self.export_dir)
+            if model is not None:
+                path = self.export_dir / EXPORT_FILES[self.runtime].format(dataset_type)
+                return model, os.path.getsize(path)
+            print(f"[Warning] No {self.runtime} export for '{dataset_type}' in {self.export_dir}; "
+                  f"falling back to eager (run export_cv.py)")
+        model = load_head(dataset_type, self.heads_dir, self.full_checkpoint).to(self.device)
+        size = model_bytes(model)
+        if self.prepare is not None:
+            model = self.prepare(model)
+        return model, size
+
+    def _evict_for(self, incoming):
+        # Called with the lock held
+        if not self.budget_bytes:
+            return
+        while self._models and sum(self._sizes.values()) + incoming > self.budget_bytes:
+            victim, _ = self._models.popitem(last=False)
+            del self._sizes[victim]
+            self._counters["evictions"] += 1
+            print(f"[i] CV head '{victim}' evicted (memory budget {self.budget_bytes / 2**20:.0f} MB)")
+
+    def get(self, dataset_type):
+        """
+        The SingleHeadModel for dataset_type, loading it if needed.
+        """
+        if dataset_type not in DATASET_TYPES:
+            raise ValueError("dataset_type must be 'chest','skin','wound'")
+        with self._lock:
+            model = self._models.get(dataset_type)
+            if model is not None:
+                self._models.move_to_end(dataset_type)
+                self._counters["hits"] += 1
+                return model
+
+            started = time.perf_counter()
+            model, size = self._load(dataset_type)
+            # Requests still running on an evicted model keep their reference
+            self._evict_for(size)
+            self._models[dataset_type] = model
+            self._sizes[dataset_type] = size
+            self._counters["loads"] += 1
+            self._load_seconds[dataset_type] = round(time.perf_counter() - started, 2)
+            return model
+
+    def preload(self, dataset_types):
+        for dataset_type in dataset_types:
+            self.get(dataset_type)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "runtime": self.runtime,
+                "budget_mb": round(self.budget_bytes / 2**20, 1),
+                "resident_mb": round(sum(self._sizes.values()) / 2**20, 1),
+                "loaded": {t: {"param_mb": round(self._sizes[t] / 2**20, 1),
+                               "load_seconds": self._load_seconds.get(t)} for t in self._models},
+                **self._counters,
+            }
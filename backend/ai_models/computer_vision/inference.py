@@ -1,36 +1,77 @@
+import asyncio
+import os
 import torch
-from torchvision import transforms
-from PIL import Image
-from backend.ai_models.computer_vision.multihead_model import MultiHeadFusionHybrid
+from pathlib import Path
+from backend.ai_models.computer_vision.head_cache import (
+    HeadCache, HEADS_DIR, CV_MEMORY_BUDGET_MB, CV_PRELOAD_HEADS, CV_RUNTIME,
+)
+from backend.ai_models.computer_vision.architecture import DATASET_TYPES
+from backend.ai_models.computer_vision.preprocess import BatchBuffer, decode_image
+from backend.ai_models.computer_vision.optimize import CV_OPTIMIZE, configure_threads, optimize_model
+from backend.utils.micro_batcher import MicroBatcher
 
-DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+# CV_RUNTIME=torchscript/int8/onnx serves export_cv.py variants, on CPU
+DEVICE = torch.device("cuda" if torch.cuda.is_available() and CV_RUNTIME == "eager" else "cpu")
 
-# Load model (assuming already trained weights saved)
-MODEL_PATH = "hybrid_multitask_model.pth"
-chest_classes, skin_classes, wound_classes = 3, 22, 10  
+# Full checkpoint (state dict or pickled module); only read for heads that
+# have no split file in HEADS_DIR (see split_checkpoint.py)
+MODEL_PATH = Path(os.getenv("CV_MODEL_PATH", "backend/ai_models/computer_vision/hybrid_multitask_model.pth"))
 
-model = MultiHeadFusionHybrid(chest_classes, skin_classes, wound_classes)
-model.load_state_dict(torch.load(MODEL_PATH, map_location=DEVICE))
-model.to(DEVICE)
-model.eval()
+configure_threads()
 
-TRANSFORM = transforms.Compose([
-    transforms.Resize((224, 224)),
-    transforms.ToTensor(),
-    transforms.Lambda(lambda x: x.repeat(3, 1, 1)),
-    transforms.Normalize([0.485,0.456,0.406],[0.229,0.224,0.225])
-])
+# Each backbone+head is loaded on first use, within CV_MEMORY_BUDGET_MB.
+# CV_OPTIMIZE=1 compiles/fuses and warms up eager heads as they load.
+heads = HeadCache(HEADS_DIR, full_checkpoint=MODEL_PATH, budget_mb=CV_MEMORY_BUDGET_MB, device=DEVICE,
+                  prepare=optimize_model if CV_OPTIMIZE and DEVICE.type == "cpu" else None)
+heads.preload(CV_PRELOAD_HEADS)
+
+CV_MAX_BATCH = int(os.getenv("CV_MAX_BATCH", "16"))
+
+def preprocess_image(img_file, dataset_type):
+    """
+    Reduced-resolution decode to a 224x224 uint8 tensor (grayscale for
+    chest, RGB for skin/wound); normalization happens in _predict_batch.
+    """
+    return decode_image(img_file, dataset_type)
+
+# Normalized straight into one reused float tensor per dataset_type
+_batch_buffer = BatchBuffer(CV_MAX_BATCH, channels_last=CV_OPTIMIZE)
+
+def _predict_batch(dataset_type, images):
+    # Runs on the batcher thread: one forward for every queued image of this type
+    model = heads.get(dataset_type)
+    batch = _batch_buffer.fill(dataset_type, images).to(DEVICE)
+    with torch.inference_mode() if CV_OPTIMIZE else torch.no_grad():
+        probs = torch.softmax(model(batch), dim=1)
+        confidence, pred_idx = probs.max(dim=1)
+    return [{"pred_class": int(i), "confidence": float(c)} for i, c in zip(pred_idx.tolist(), confidence.tolist())]
+
+# Concurrent uploads of the same dataset_type share one forward pass
+image_batcher = MicroBatcher(
+    _predict_batch,
+    max_batch_size=CV_MAX_BATCH,
+    max_wait_ms=float(os.getenv("CV_MAX_WAIT_MS", "15")),
+    name="cv-batcher",
+)
+
+def _check_dataset_type(dataset_type):
+    if dataset_type not in DATASET_TYPES:
+        raise ValueError("dataset_type must be 'chest','skin','wound'")
 
 def predict_image(img_path, dataset_type):
     """
     img_path: path to image
     dataset_type: 'chest', 'skin', 'wound'
     """
-    img = Image.open(img_path).convert("RGB")
-    img = TRANSFORM(img).unsqueeze(0).to(DEVICE)
-    with torch.no_grad():
-        logits = model(img, dataset_type)
-        probs = torch.softmax(logits, dim=1)
-        pred_idx = probs.argmax().item()
-        confidence = probs.max().item()
-    return {"pred_class": pred_idx, "confidence": confidence}
+    _check_dataset_type(dataset_type)
+    img = preprocess_image(img_path, dataset_type)
+    return image_batcher.submit(img, key=dataset_type).result()
+
+async def predict_image_async(img_file, dataset_type):
+    """
+    predict_image for async handlers: decoding runs in a thread and the
+    result is awaited from the batcher without blocking the event loop.
+    """
+    _check_dataset_type(dataset_type)
+    img = await asyncio.to_thread(preprocess_image, img_file, dataset_type)
+    return await asyncio.wrap_future(image_batcher.submit(img, key=dataset_type))
@@ -165,44 +165,19 @@ wound_loader = DataLoader(wound_train_ds,batch_size=batch_size,shuffle=True,num_
 wound_valid_loader = DataLoader(wound_val_ds,batch_size=batch_size,shuffle=False,num_workers=num_workers,pin_memory=True)
 
 # ----------------- MODEL -----------------
-class MultiHeadFusionHybrid(nn.Module):
-    def __init__(self, chest_classes, skin_classes, wound_classes):
-        super().__init__()
-        self.chest_backbone = nn.Sequential(*list(models.resnet50(weights=models.ResNet50_Weights.IMAGENET1K_V2).children())[:-1])
-        self.skin_backbone = nn.Sequential(*list(models.efficientnet_b3(weights=models.EfficientNet_B3_Weights.IMAGENET1K_V1).children())[:-1])
-        self.wound_backbone = nn.Sequential(*list(models.densenet121(weights=models.DenseNet121_Weights.IMAGENET1K_V1).features), nn.AdaptiveAvgPool2d(1))
-
-        def make_head(in_dim,out_dim):
-            return nn.Sequential(
-                nn.Linear(in_dim,512), nn.ReLU(inplace=True), nn.Dropout(0.4),
-                nn.Linear(512,256), nn.ReLU(inplace=True), nn.Dropout(0.25),
-                nn.Linear(256,128), nn.ReLU(inplace=True), nn.Dropout(0.2),
-                nn.Linear(128,out_dim)
-            )
-
-        self.chest_head = make_head(2048,chest_classes)
-        self.skin_head = make_head(1536,skin_classes)
-        self.wound_head = make_head(1024,wound_classes)
-
-    def forward(self,x,dataset_type):
-        if dataset_type=="chest":
-            feat = self.chest_backbone(x).view(x.size(0),-1)
-            return self.chest_head(feat)
-        elif dataset_type=="skin":
-            feat = self.skin_backbone(x).view(x.size(0),-1)
-            return self.skin_head(feat)
-        elif dataset_type=="wound":
-            feat = self.wound_backbone(x).view(x.size(0),-1)
-            return self.wound_head(feat)
-        else:
-            raise ValueError("dataset_type must be 'chest','skin','wound'")
+# The network lives in architecture.py so inference can import it without
+# running this script
+try:
+    from backend.ai_models.computer_vision.architecture import MultiHeadFusionHybrid
+except ImportError:
+    from architecture import MultiHeadFusionHybrid
 
 # ----------------- LOSS & OPTIMIZER -----------------
 chest_classes = len(set([lbl for _,lbl in chest_train_ds.df["class_id"].items()]))
 skin_classes = len(skin_train_ds.classes)
 wound_classes = len(wound_ds.classes)
 
-model = MultiHeadFusionHybrid(chest_classes,skin_classes,wound_classes).to(device)
+model = MultiHeadFusionHybrid(chest_classes,skin_classes,wound_classes,pretrained=True).to(device)
 # Freeze skin backbone initially
 for p in model.skin_backbone.parameters(): p.requires_grad = False
 
@@ -311,5 +286,6 @@ for epoch in range(num_epochs):
 print("\nTraining complete ✅")
 print("Chest classes:",chest_classes,"Skin classes:",skin_classes,"Wound classes:",wound_classes)
 
-torch.save(model, "hybrid_multitask_model.pth")
+# State dict only: loadable without this script (architecture.load_model)
+torch.save(model.state_dict(), "hybrid_multitask_model.pth")
 print("Hybrid model saved as hybrid_multitask_model.pth ✅")
\ No newline at end of file
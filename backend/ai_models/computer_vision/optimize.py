@@ -0,0 +1,76 @@
+"""
+Opt-in optimized eager mode for the CV heads.
+
+With CV_OPTIMIZE=1, every eager backbone+head is prepared once at load time:
+    - channels-last weights (inputs are built channels-last by BatchBuffer)
+    - torch.compile when available (CV_COMPILE=1, the default); otherwise,
+      or if compilation fails, a traced + frozen TorchScript module, which
+      folds conv+bn and fuses pointwise ops
+    - a warmup over the batch sizes the batcher produces, so compilation is
+      paid at load time instead of by the first request
+and run under torch.inference_mode(). CV_INTRAOP_THREADS /
+CV_INTEROP_THREADS pin the torch thread pools of each worker process.
+"""
+
+import os
+import time
+
+import torch
+
+from backend.ai_models.computer_vision.preprocess import IMAGE_SIZE
+
+CV_OPTIMIZE = os.getenv("CV_OPTIMIZE", "0") == "1"
+CV_COMPILE = os.getenv("CV_COMPILE", "1") == "1"
+CV_INTRAOP_THREADS = int(os.getenv("CV_INTRAOP_THREADS", "0"))
+CV_INTEROP_THREADS = int(os.getenv("CV_INTEROP_THREADS", "0"))
+
+
+def configure_threads(intra=CV_INTRAOP_THREADS, inter=CV_INTEROP_THREADS):
+    """
+    Sets torch thread pools for this process; 0 leaves the default.
+    """
+    if intra:
+        torch.set_num_threads(intra)
+    if inter:
+        try:
+            torch.set_num_interop_threads(inter)
+        except RuntimeError:
+            # Only allowed before the first parallel op of the process
+            print("[Warning] CV_INTEROP_THREADS ignored: inter-op pool already started")
+
+
+def example_batch(batch_size, channels_last=True):
+    x = torch.randn(batch_size, 3, IMAGE_SIZE, IMAGE_SIZE)
+    return x.contiguous(memory_format=torch.channels_last) if channels_last else x
+
+
+def warmup(model, batch_sizes=(1, 2), repeats=2):
+    with torch.inference_mode():
+        for batch_size in batch_sizes:
+            x = example_batch(batch_size)
+            for _ in range(repeats):
+                model(x)
+
+
+def optimize_model(model, compile=CV_COMPILE, warmup_batch_sizes=(1, 2, 8)):
+    """
+    Returns the optimized, warmed-up version of an eager SingleHeadModel.
+    """
+    started = time.perf_counter()
+    model = model.eval().to(memory_format=torch.channels_last)
+    optimized = None
+    if compile and hasattr(torch, "compile"):
+        try:
+            # dynamic: the batcher sends any batch size up to CV_MAX_BATCH
+            optimized = torch.compile(model, dynamic=True)
+            warmup(optimized, warmup_batch_sizes, repeats=1)
+        except Exception as e:
+            print(f"[Warning] torch.compile failed ({e}); using frozen TorchScript")
+            optimized = None
+    if optimized is None:
+        with torch.no_grad():
+            optimized = torch.jit.freeze(torch.jit.trace(model, example_batch(1)))
+    warmup(optimized, warmup_batch_sizes)
+    print(f"[i] CV head optimized in {time.perf_counter() - started:.1f}s "
+          f"({'compiled' if not isinstance(optimized, torch.jit.ScriptModule) else 'torchscript'})")
+    return optimized
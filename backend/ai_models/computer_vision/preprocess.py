@@ -0,0 +1,77 @@
+"""
+Reduced-resolution decode and in-place normalization for CV uploads.
+
+Phone photos arrive as 12 MP JPEGs, but the networks only see 224x224.
+JPEG draft mode lets libjpeg decode directly at 1/2, 1/4 or 1/8 scale (the
+smallest one still >= 224 px). Other formats use a reducing resize. Images
+are kept as uint8 until they are normalized straight into a preallocated
+float batch buffer.
+
+Per-dataset inputs match training (multihead_model.py):
+    chest  grayscale, repeated to 3 channels
+    skin   RGB
+    wound  RGB
+all resized to 224x224 and normalized with the ImageNet mean/std.
+"""
+
+import numpy as np
+import torch
+from PIL import Image
+
+IMAGE_SIZE = 224
+MEAN = torch.tensor([0.485, 0.456, 0.406]).view(3, 1, 1)
+STD = torch.tensor([0.229, 0.224, 0.225]).view(3, 1, 1)
+DATASET_MODES = {"chest": "L", "skin": "RGB", "wound": "RGB"}
+
+
+def decode_image(src, dataset_type, size=IMAGE_SIZE):
+    """
+    Decodes a path or file object to a (size, size, C) uint8 tensor, C=1 for
+    chest and 3 otherwise, without materializing the full-resolution image
+    when the format allows it.
+    """
+    mode = DATASET_MODES[dataset_type]
+    with Image.open(src) as img:
+        if img.format == "JPEG":
+            # Picks the largest DCT scale-down that keeps both sides >= size
+            img.draft(mode, (size, size))
+        img = img.convert(mode)
+        # reducing_gap: integer box reduction first, then bilinear for the rest
+        img = img.resize((size, size), Image.BILINEAR, reducing_gap=3.0)
+        pixels = np.asarray(img, dtype=np.uint8)
+    if pixels.ndim == 2:
+        pixels = pixels[:, :, None]
+    return torch.from_numpy(pixels.copy())
+
+
+def normalize_into(pixels, out):
+    """
+    Writes the normalized (3, H, W) float image for uint8 `pixels`
+    (H, W, C) into `out`, repeating a single channel to three.
+    """
+    out.copy_(pixels.permute(2, 0, 1).expand(3, -1, -1))
+    out.div_(255.0).sub_(MEAN).div_(STD)
+    return out
+
+
+class BatchBuffer:
+    """
+    Reusable (max_batch, 3, size, size) float tensor per dataset type. Only
+    use from one thread at a time (the batcher thread). channels_last lays
+    it out NHWC for the optimized eager mode.
+    """
+    def __init__(self, max_batch, size=IMAGE_SIZE, channels_last=False):
+        self.max_batch = max_batch
+        self.size = size
+        self.memory_format = torch.channels_last if channels_last else torch.contiguous_format
+        self._buffers = {}
+
+    def fill(self, dataset_type, images):
+        n = len(images)
+        buf = self._buffers.get(dataset_type)
+        if buf is None or buf.size(0) < n:
+            buf = torch.empty(max(n, self.max_batch), 3, self.size, self.size, memory_format=self.memory_format)
+            self._buffers[dataset_type] = buf
+        for i, pixels in enumerate(images):
+            normalize_into(pixels, buf[i])
+        return buf[:n]
@@ -0,0 +1,47 @@
+"""
+Split the MultiHeadFusionHybrid checkpoint into one file per dataset type.
+
+Each output file holds one backbone and its head in SingleHeadModel layout:
+    {"dataset_type": ..., "num_classes": ..., "state_dict": {...}}
+head_cache.py loads these on demand, so a node only pays for the networks
+it actually serves.
+
+Usage (from repo root):
+    python -m backend.ai_models.computer_vision.split_checkpoint
+"""
+
+import argparse
+import os
+from pathlib import Path
+
+import torch
+
+from backend.ai_models.computer_vision.architecture import (
+    DATASET_TYPES, load_state_dict, num_classes_from_state, split_state_dict,
+)
+
+MODEL_PATH = Path("backend/ai_models/computer_vision/hybrid_multitask_model.pth")
+HEADS_DIR = Path("backend/ai_models/computer_vision/heads")
+
+
+def split_checkpoint(model_path=MODEL_PATH, out_dir=HEADS_DIR):
+    state = load_state_dict(model_path)
+    counts = num_classes_from_state(state)
+    os.makedirs(out_dir, exist_ok=True)
+    for dataset_type in DATASET_TYPES:
+        path = Path(out_dir) / f"{dataset_type}.pth"
+        torch.save({
+            "dataset_type": dataset_type,
+            "num_classes": counts[dataset_type],
+            "state_dict": split_state_dict(state, dataset_type),
+        }, path)
+        print(f"[i] {dataset_type}: {counts[dataset_type]} classes -> {path} "
+              f"({os.path.getsize(path) / 2**20:.1f} MB)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", type=str, default=str(MODEL_PATH))
+    parser.add_argument("--out-dir", type=str, default=str(HEADS_DIR))
+    args = parser.parse_args()
+    split_checkpoint(Path(args.model), Path(args.out_dir))
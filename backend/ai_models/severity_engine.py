@@ -10,50 +10,73 @@ Outputs:
     - severity_level: mild / moderate / severe
 """
 
+import re
+
+# ---------------- Symptom phrases ----------------
+CRITICAL_SYMPTOMS = {
+    "cardiac arrest": 40,
+    "blood in stool": 30,
+    "blood in vomit": 30,
+    "blood cough": 30,
+    "fainting": 25,
+    "fracture": 20,
+    "chest pain": 25,
+    "severe shortness of breath": 30,
+    "unconsciousness": 40
+}
+
+MODERATE_SYMPTOMS = {
+    "high fever": 15,
+    "severe headache": 10,
+    "significant swelling": 10,
+    "large bruises": 10,
+    "persistent vomiting": 15,
+    "persistent diarrhea": 15,
+    "moderate shortness of breath": 15,
+    "moderate chest pain": 15
+}
+
+MILD_SYMPTOMS = {
+    "cough": 5,
+    "fatigue": 5,
+    "headache": 5,
+    "stomach ache": 5,
+    "minor bruises": 3,
+    "mild fever": 5,
+    "sore throat": 3
+}
+
+# Longest first, so "moderate chest pain" wins over "chest pain"
+_PHRASE_RE = re.compile(r"\b(" + "|".join(
+    re.escape(p) for p in sorted({**CRITICAL_SYMPTOMS, **MODERATE_SYMPTOMS, **MILD_SYMPTOMS}, key=len, reverse=True)
+) + r")\b")
+
+
+def extract_symptoms(text):
+    """
+    Returns the known symptom phrases found in free text (e.g. a normalized
+    transcript), in order of appearance. Overlapping matches keep the longest
+    phrase, so "severe headache" is not also counted as "headache".
+    """
+    if not text:
+        return []
+    return _PHRASE_RE.findall(re.sub(r"\s+", " ", text.lower()))
+
+
 def compute_severity(symptoms=[], vitals=None, age=None, comorbidities=[]):
     score = 0
 
     # ---------------- Critical symptoms ----------------
-    critical_symptoms = {
-        "cardiac arrest": 40,
-        "blood in stool": 30,
-        "blood in vomit": 30,
-        "blood cough": 30,
-        "fainting": 25,
-        "fracture": 20,
-        "chest pain": 25,
-        "severe shortness of breath": 30,
-        "unconsciousness": 40
-    }
     for s in symptoms:
-        score += critical_symptoms.get(s.lower(), 0)
+        score += CRITICAL_SYMPTOMS.get(s.lower(), 0)
 
     # ---------------- Moderate symptoms ----------------
-    moderate_symptoms = {
-        "high fever": 15,
-        "severe headache": 10,
-        "significant swelling": 10,
-        "large bruises": 10,
-        "persistent vomiting": 15,
-        "persistent diarrhea": 15,
-        "moderate shortness of breath": 15,
-        "moderate chest pain": 15
-    }
     for s in symptoms:
-        score += moderate_symptoms.get(s.lower(), 0)
+        score += MODERATE_SYMPTOMS.get(s.lower(), 0)
 
     # ---------------- Mild symptoms ----------------
-    mild_symptoms = {
-        "cough": 5,
-        "fatigue": 5,
-        "headache": 5,
-        "stomach ache": 5,
-        "minor bruises": 3,
-        "mild fever": 5,
-        "sore throat": 3
-    }
     for s in symptoms:
-        score += mild_symptoms.get(s.lower(), 0)
+        score += MILD_SYMPTOMS.get(s.lower(), 0)
 
     # ---------------- Vitals scoring ----------------
     if vitals:
@@ -109,6 +132,14 @@ def compute_severity(symptoms=[], vitals=None, age=None, comorbidities=[]):
     return {"severity_score": score, "severity_level": level}
 
 
+def dispatch_level(severity_score):
+    """
+    Maps a 0-100 severity_score to the 1-5 severity_level used by the
+    dispatch services (ambulance from 3, i.e. a score of 40).
+    """
+    return min(5, 1 + int(severity_score) // 20)
+
+
 # ---------------- Quick test ----------------
 if __name__ == "__main__":
     sample = compute_severity(
@@ -0,0 +1,98 @@
+"""
+Benchmark: fixed padding to 50 vs. length-bucketed dynamic padding.
+
+Runs one training epoch (forward + backward) and one inference pass over
+the same rows with a freshly initialized SymptomClassifier, so no trained
+checkpoint is needed. Row lengths come from a prepare_corpus.py directory
+(--corpus-dir) or from a synthetic short-text distribution.
+
+Usage (from repo root):
+    python -m backend.ai_models.symptom_nlp.bench_padding --corpus-dir corpus
+"""
+
+import argparse
+import time
+
+import numpy as np
+import torch
+from torch import nn
+from torch.utils.data import DataLoader
+
+from backend.ai_models.symptom_nlp.prepare_corpus import Corpus
+from backend.ai_models.symptom_nlp.train_symptom_nlp import (
+    BucketBatchSampler, IdsDataset, SymptomClassifier, collate_batch, dynamic_collate,
+)
+
+
+def load_rows(args, rng):
+    if args.corpus_dir:
+        corpus = Corpus.load(args.corpus_dir)
+        rows = [(corpus.row(i), int(corpus.labels[i])) for i in range(len(corpus))]
+        return rows, len(corpus.vocab), len(corpus.classes)
+    # Symptom strings are mostly a handful of tokens with a long tail
+    lengths = np.clip(rng.lognormal(2.0, 0.6, args.rows).astype(int), 1, 50)
+    rows = [(rng.integers(2, args.vocab_size, n), int(rng.integers(args.classes))) for n in lengths]
+    return rows, args.vocab_size, args.classes
+
+
+def loaders(dataset, batch_size, dynamic, shuffle):
+    if not dynamic:
+        return DataLoader(dataset, batch_size=batch_size, shuffle=shuffle, collate_fn=collate_batch)
+    sampler = BucketBatchSampler(dataset.lengths(), batch_size, shuffle=shuffle)
+    return DataLoader(dataset, batch_sampler=sampler, collate_fn=dynamic_collate)
+
+
+def train_epoch(model, loader):
+    optimizer = torch.optim.Adam(model.parameters(), lr=1e-3)
+    criterion = nn.CrossEntropyLoss()
+    model.train()
+    pad_cells = real_cells = 0
+    start = time.perf_counter()
+    for x, lengths, y in loader:
+        optimizer.zero_grad()
+        criterion(model(x, lengths), y).backward()
+        optimizer.step()
+        pad_cells += x.numel()
+        real_cells += int(lengths.sum())
+    return time.perf_counter() - start, real_cells / max(1, pad_cells)
+
+
+def infer(model, loader):
+    model.eval()
+    rows = 0
+    start = time.perf_counter()
+    with torch.no_grad():
+        for x, lengths, _ in loader:
+            model(x, lengths)
+            rows += x.size(0)
+    return rows / (time.perf_counter() - start)
+
+
+def main(args):
+    torch.set_num_threads(args.threads)
+    rng = np.random.default_rng(0)
+    rows, vocab_size, num_classes = load_rows(args, rng)
+    dataset = IdsDataset(rows)
+    lengths = np.array(dataset.lengths())
+    print(f"[i] {len(rows)} rows | mean length {lengths.mean():.1f} | p95 {np.percentile(lengths, 95):.0f}")
+
+    for name, dynamic in (("fixed-50", False), ("dynamic", True)):
+        torch.manual_seed(0)
+        model = SymptomClassifier(vocab_size, args.embed_dim, args.hidden_dim, num_classes)
+        epoch_s, fill = train_epoch(model, loaders(dataset, args.batch_size, dynamic, shuffle=True))
+        throughput = infer(model, loaders(dataset, args.infer_batch_size, dynamic, shuffle=False))
+        print(f"{name:<9} epoch {epoch_s:7.2f} s | non-pad cells {fill:6.1%} | inference {throughput:9.0f} rows/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus-dir", type=str, default=None)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--vocab-size", type=int, default=10000)
+    parser.add_argument("--classes", type=int, default=100)
+    parser.add_argument("--embed-dim", type=int, default=64)
+    parser.add_argument("--hidden-dim", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--infer-batch-size", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=1)
+    main(parser.parse_args())
@@ -0,0 +1,72 @@
+"""
+Benchmark: eager PyTorch vs. ONNX Runtime for the symptom classifier.
+
+Scores already-normalized English symptom strings one at a time (the
+/diagnose path) and reports p50/p99 latency per runtime, plus top-5
+agreement between the two.
+
+Usage (from repo root, after export_onnx.py):
+    python -m backend.ai_models.symptom_nlp.bench_runtime --repeats 200
+"""
+
+import argparse
+import time
+
+import torch
+
+from backend.ai_models.symptom_nlp import inference
+
+CORPUS = [
+    "fever",
+    "cough cold",
+    "headache and vomiting",
+    "fever with chills and body ache",
+    "chest pain shortness of breath sweating",
+    "skin rash itching redness on arms",
+    "abdominal pain diarrhoea nausea for three days",
+    "burning micturition frequent urination lower back pain",
+    "joint pain swelling stiffness in the morning fatigue",
+    "high fever headache pain behind the eyes joint pain rash nausea",
+    "continuous sneezing runny nose watery eyes sore throat mild fever",
+    "weight loss excessive thirst frequent urination blurred vision tiredness slow healing wounds",
+]
+
+def percentile(sorted_vals, q):
+    return sorted_vals[min(len(sorted_vals) - 1, int(len(sorted_vals) * q))]
+
+def bench(runtime, seqs, repeats):
+    for seq in seqs:  # warmup
+        inference._forward([seq], runtime)
+    timings = []
+    for _ in range(repeats):
+        for seq in seqs:
+            start = time.perf_counter()
+            inference._forward([seq], runtime)
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f"{runtime:<6} p50 {percentile(timings, 0.50):7.3f} ms | p99 {percentile(timings, 0.99):7.3f} ms | "
+          f"mean {sum(timings) / len(timings):7.3f} ms | n={len(timings)}")
+
+def main(args):
+    torch.set_num_threads(args.threads)
+    seqs = [inference.vocab.encode(t) or [1] for t in CORPUS]
+
+    bench("torch", seqs, args.repeats)
+    try:
+        inference.get_onnx_session()
+    except Exception as e:
+        raise SystemExit(f"ONNX model not available ({e}); run export_onnx.py first")
+    bench("onnx", seqs, args.repeats)
+
+    agree = sum(
+        torch.equal(inference._forward([s], "torch").topk(5, dim=1).indices,
+                    inference._forward([s], "onnx").topk(5, dim=1).indices)
+        for s in seqs
+    )
+    print(f"top-5 agreement: {agree}/{len(seqs)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=1)
+    main(parser.parse_args())
@@ -0,0 +1,140 @@
+"""
+Compact, memory-mapped vocabulary for the symptom classifier.
+
+vocab.pkl is a pickled Vocab object: it needs the training module to
+unpickle, and every worker process builds its own Python dict of tokens.
+vocab.npy instead holds one sorted table of fixed-width byte strings with
+their ids. It is opened with mmap, so worker processes share the same pages,
+and a whole text is encoded with one vectorized binary search.
+
+Convert an existing pickle (from repo root):
+    python -m backend.ai_models.symptom_nlp.compact_vocab \
+        --from-pickle backend/ai_models/symptom_nlp/output/vocab.pkl
+"""
+
+import argparse
+import os
+import pickle
+from pathlib import Path
+
+import numpy as np
+
+PAD_TOKEN, UNK_TOKEN = "<PAD>", "<UNK>"
+
+
+class CompactVocab:
+    def __init__(self, table):
+        # table: structured array (token: S<w>, id: u4) sorted by token
+        self._table = table
+        self._tokens = table["token"]
+        self._ids = table["id"]
+        self.width = table.dtype["token"].itemsize
+        self.size = int(self._ids.max()) + 1 if len(table) else 0
+        self.unk_id = self._lookup_one(UNK_TOKEN, default=1)
+        self.pad_id = self._lookup_one(PAD_TOKEN, default=0)
+
+    # ------------------ Build / IO ------------------
+
+    @classmethod
+    def from_tokens(cls, idx2token):
+        """
+        Builds the table from an id -> token list (Vocab.idx2token).
+        """
+        encoded = [t.encode("utf-8") for t in idx2token]
+        width = max((len(t) for t in encoded), default=1)
+        table = np.empty(len(encoded), dtype=[("token", f"S{width}"), ("id", "<u4")])
+        table["token"] = encoded
+        table["id"] = np.arange(len(encoded), dtype=np.uint32)
+        table.sort(order="token")
+        return cls(table)
+
+    @classmethod
+    def from_vocab(cls, vocab):
+        return cls.from_tokens(vocab.idx2token)
+
+    def save(self, path):
+        np.save(path, self._table, allow_pickle=False)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        return cls(np.load(path, mmap_mode="r" if mmap else None, allow_pickle=False))
+
+    def truncate(self, size):
+        """
+        Keeps ids below `size` (in memory, not mapped).
+        """
+        return CompactVocab(np.asarray(self._table[self._ids < size]))
+
+    # ------------------ Encoding ------------------
+
+    def _lookup_one(self, token, default):
+        ids = self._encode_tokens([token])
+        return int(ids[0]) if len(ids) and ids[0] != -1 else default
+
+    def _encode_tokens(self, tokens, unk=-1):
+        raw = [t.encode("utf-8") for t in tokens]
+        query = np.array(raw, dtype=self._tokens.dtype)  # longer tokens are truncated...
+        fits = np.fromiter((len(r) <= self.width for r in raw), dtype=bool, count=len(raw))
+        pos = np.searchsorted(self._tokens, query)
+        pos = np.minimum(pos, len(self._tokens) - 1)
+        hit = (self._tokens[pos] == query) & fits  # ...so they must not match
+        return np.where(hit, self._ids[pos], unk).astype(np.int64)
+
+    def encode_array(self, text):
+        """
+        Whitespace-tokenizes text straight into an int64 id array.
+        """
+        tokens = text.split()
+        if not tokens or not len(self._tokens):
+            return np.empty(0, dtype=np.int64)
+        return self._encode_tokens(tokens, unk=self.unk_id)
+
+    def encode(self, text):
+        """
+        Drop-in for Vocab.encode: returns a list of ids.
+        """
+        return self.encode_array(text).tolist()
+
+    def __len__(self):
+        return self.size
+
+
+# ------------------ Pickle conversion ------------------
+
+class _VocabUnpickler(pickle.Unpickler):
+    # vocab.pkl was written by train_symptom_nlp run as a script, so the class
+    # may be recorded as __main__.Vocab; resolve it to the real one.
+    def find_class(self, module, name):
+        if name == "Vocab":
+            from backend.ai_models.symptom_nlp.train_symptom_nlp import Vocab
+            return Vocab
+        return super().find_class(module, name)
+
+
+def load_pickle(pkl_path):
+    """
+    CompactVocab built from a pickled Vocab, wherever the pickle says Vocab
+    was defined.
+    """
+    with open(pkl_path, "rb") as f:
+        return CompactVocab.from_vocab(_VocabUnpickler(f).load())
+
+
+def convert_pickle(pkl_path, out_path=None):
+    out_path = Path(out_path) if out_path else Path(pkl_path).with_suffix(".npy")
+    compact = load_pickle(pkl_path)
+    # Written under a temporary name, so a worker starting at the same time
+    # never maps a half-written file
+    tmp_path = out_path.with_suffix(f".{os.getpid()}.npy")
+    compact.save(tmp_path)
+    os.replace(tmp_path, out_path)
+    print(f"[i] Wrote {out_path} ({len(compact)} tokens, width {compact.width} bytes)")
+    return compact
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--from-pickle", type=str, required=True)
+    parser.add_argument("--out", type=str, default=None)
+    args = parser.parse_args()
+    convert_pickle(args.from_pickle, args.out)
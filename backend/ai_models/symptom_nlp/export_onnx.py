@@ -0,0 +1,113 @@
+"""
+Export SymptomClassifier to ONNX for serving with ONNX Runtime.
+
+pack_padded_sequence does not export cleanly, so the exported graph runs
+the GRU over unpadded input. That is exact as long as every row in a batch
+has the same length, which is how inference.py feeds the ONNX runtime
+(rows are grouped by exact token count).
+
+--check compares top-5 predictions of the exported model with the eager
+PyTorch model on random token sequences and fails if they disagree.
+
+Usage (from repo root):
+    python -m backend.ai_models.symptom_nlp.export_onnx --check
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import torch
+from torch import nn
+
+from backend.ai_models.symptom_nlp.train_symptom_nlp import SymptomClassifier
+
+OUTPUT_DIR = Path("backend/ai_models/symptom_nlp/output")
+MODEL_PATH = OUTPUT_DIR / "symptom_classifier.pth"
+ONNX_PATH = OUTPUT_DIR / "symptom_classifier.onnx"
+
+
+class UnpackedSymptomClassifier(nn.Module):
+    """
+    Same weights as SymptomClassifier; forward takes equal-length rows only.
+    """
+    def __init__(self, model):
+        super().__init__()
+        self.embedding = model.embedding
+        self.encoder = model.encoder
+        self.fc = model.fc
+
+    def forward(self, ids):
+        _, h_n = self.encoder(self.embedding(ids))
+        return self.fc(torch.cat([h_n[0], h_n[1]], dim=1))
+
+
+def load_eager(model_path=MODEL_PATH):
+    """
+    Rebuilds SymptomClassifier from the checkpoint alone: sizes are read from
+    the weight shapes, so neither vocab.pkl nor label_encoder.pkl is needed.
+    """
+    state = torch.load(model_path, map_location="cpu")
+    vocab_size, embed_dim = state["embedding.weight"].shape
+    hidden_dim = state["encoder.weight_hh_l0"].shape[1]
+    num_classes = state["fc.weight"].shape[0]
+    model = SymptomClassifier(vocab_size, embed_dim, hidden_dim, num_classes)
+    model.load_state_dict(state)
+    model.eval()
+    return model
+
+
+def export(model, onnx_path=ONNX_PATH, opset=14):
+    wrapper = UnpackedSymptomClassifier(model).eval()
+    dummy = torch.randint(2, model.embedding.num_embeddings, (2, 7), dtype=torch.long)
+    torch.onnx.export(
+        wrapper, (dummy,), str(onnx_path),
+        input_names=["ids"], output_names=["logits"],
+        dynamic_axes={"ids": {0: "batch", 1: "seq"}, "logits": {0: "batch"}},
+        opset_version=opset,
+    )
+    print(f"[i] Exported {onnx_path}")
+
+
+def check_parity(model, onnx_path=ONNX_PATH, samples=500, max_len=40, k=5, seed=0):
+    """
+    Top-k agreement between eager (packed) and ONNX outputs. Returns the
+    fraction of samples whose top-k classes match exactly, in order.
+    """
+    import onnxruntime as ort
+    session = ort.InferenceSession(str(onnx_path), providers=["CPUExecutionProvider"])
+    rng = np.random.default_rng(seed)
+    vocab_size = model.embedding.num_embeddings
+    k = min(k, model.fc.out_features)
+
+    agree = 0
+    for _ in range(samples):
+        length = int(rng.integers(1, max_len + 1))
+        ids = rng.integers(1, vocab_size, size=(1, length), dtype=np.int64)
+        with torch.no_grad():
+            eager = model(torch.from_numpy(ids), torch.tensor([length]))
+        onnx_logits = torch.from_numpy(session.run(None, {"ids": ids})[0])
+        if torch.equal(eager.topk(k, dim=1).indices, onnx_logits.topk(k, dim=1).indices):
+            agree += 1
+    return agree / samples
+
+
+def main(args):
+    model = load_eager(Path(args.model))
+    export(model, Path(args.output), args.opset)
+    if args.check:
+        score = check_parity(model, Path(args.output), samples=args.samples)
+        print(f"[i] Top-5 agreement with eager model: {score:.4f}")
+        if score < args.min_agreement:
+            raise SystemExit(f"Parity check failed ({score:.4f} < {args.min_agreement})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", type=str, default=str(MODEL_PATH))
+    parser.add_argument("--output", type=str, default=str(ONNX_PATH))
+    parser.add_argument("--opset", type=int, default=14)
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--min-agreement", type=float, default=0.99)
+    main(parser.parse_args())
@@ -1,19 +1,32 @@
+import os
 import torch
 import pickle
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from backend.audio_pipeline.normalize import normalize_text
 from torch.nn.functional import softmax
 from backend.ai_models.symptom_nlp.train_symptom_nlp import SymptomClassifier, collate_batch
+from backend.ai_models.symptom_nlp.compact_vocab import CompactVocab
 
 DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
 # Load vocab and label encoder
-VOCAB_PATH = Path("backend/ai_models/symptom_nlp/output/vocab.pkl")
+# vocab.npy (compact_vocab.py) is memory-mapped and shared between worker
+# processes; it is committed, and converting vocab.pkl is an offline step
+COMPACT_VOCAB_PATH = Path("backend/ai_models/symptom_nlp/output/vocab.npy")
 LABEL_ENCODER_PATH = Path("backend/ai_models/symptom_nlp/output/label_encoder.pkl")
 MODEL_PATH = Path("backend/ai_models/symptom_nlp/output/symptom_classifier.pth")
+ONNX_PATH = Path("backend/ai_models/symptom_nlp/output/symptom_classifier.onnx")
 
-with open(VOCAB_PATH, "rb") as f:
-    vocab = pickle.load(f)
+# "torch" (eager) or "onnx" (ONNX Runtime, see export_onnx.py)
+RUNTIME = os.getenv("SYMPTOM_NLP_RUNTIME", "torch").lower()
+
+if not COMPACT_VOCAB_PATH.exists():
+    raise FileNotFoundError(
+        f"{COMPACT_VOCAB_PATH} not found; convert the training vocab with "
+        f"python -m backend.ai_models.symptom_nlp.compact_vocab --from-pickle <output>/vocab.pkl"
+    )
+vocab = CompactVocab.load(COMPACT_VOCAB_PATH)
 
 with open(LABEL_ENCODER_PATH, "rb") as f:
     le = pickle.load(f)
@@ -25,7 +38,62 @@ model.load_state_dict(torch.load(MODEL_PATH, map_location=DEVICE))
 model.to(DEVICE)
 model.eval()
 
+# ------------------ ONNX Runtime ------------------
+_onnx_session = None
+
+def get_onnx_session():
+    global _onnx_session
+    if _onnx_session is None:
+        import onnxruntime as ort
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        _onnx_session = ort.InferenceSession(str(ONNX_PATH), opts, providers=["CPUExecutionProvider"])
+    return _onnx_session
+
+if RUNTIME == "onnx":
+    try:
+        get_onnx_session()
+    except Exception as e:
+        print(f"[Warning] ONNX runtime unavailable ({e}); falling back to PyTorch")
+        RUNTIME = "torch"
+
+def _forward(seqs, runtime=None):
+    """
+    Logits for a list of token-id lists, in order.
+    """
+    if (runtime or RUNTIME) == "onnx":
+        # The exported graph has no packing, so rows must share one length
+        session = get_onnx_session()
+        logits = torch.empty(len(seqs), num_classes)
+        by_len = {}
+        for row, seq in enumerate(seqs):
+            by_len.setdefault(len(seq), []).append(row)
+        for rows in by_len.values():
+            ids = np.array([seqs[r] for r in rows], dtype=np.int64)
+            logits[rows] = torch.from_numpy(session.run(None, {"ids": ids})[0])
+        return logits
+
+    # Pad to the longest row in the batch only
+    ids, lengths, _ = collate_batch(
+        [(torch.as_tensor(seq, dtype=torch.long), 0) for seq in seqs], max_len=None, dynamic=True
+    )
+    with torch.no_grad():
+        return model(ids.to(DEVICE), lengths.to(DEVICE)).cpu()
+
+def normalize_text(text):
+    # The audio pipeline lives under backend/ as top-level packages, imported
+    # the way main.py does so the API shares one translation batcher. Only
+    # needed when raw text is scored, not for already-normalized input.
+    from audio_pipeline.normalize import normalize_text
+    return normalize_text(text)
+
 TOP_K = 5
+# Batched scoring: inputs are sorted by token count and cut into buckets of
+# at most BATCH_SIZE whose lengths differ by at most BUCKET_WIDTH tokens
+BATCH_SIZE = 64
+BUCKET_WIDTH = 8
+# Concurrent normalize_text calls let the translation batcher group them
+NORMALIZE_THREADS = 8
 
 def predict_top_diseases(text):
     """
@@ -33,18 +101,58 @@ def predict_top_diseases(text):
     Output: top-k predicted diseases
     """
     text_norm = normalize_text(text)
-    ids = torch.tensor([vocab.encode(text_norm)], dtype=torch.long)
-    lengths = torch.tensor([ids.size(1)], dtype=torch.long)
-
-    ids, lengths = ids.to(DEVICE), lengths.to(DEVICE)
-    with torch.no_grad():
-        logits = model(ids, lengths)
-        probs = softmax(logits, dim=1)
-        top_probs, top_idx = torch.topk(probs, k=min(TOP_K, logits.size(1)), dim=1)
+    # Empty input still needs one step for pack_padded_sequence
+    logits = _forward([vocab.encode(text_norm) or [1]])
+    probs = softmax(logits, dim=1)
+    top_probs, top_idx = torch.topk(probs, k=min(TOP_K, logits.size(1)), dim=1)
 
     predictions = [{"disease": le.classes_[i], "probability": float(p)} for i, p in zip(top_idx[0], top_probs[0])]
     return predictions
 
+def _length_buckets(encoded, batch_size=BATCH_SIZE, bucket_width=BUCKET_WIDTH):
+    """
+    Yields lists of input indices, sorted by length, so each bucket pads to
+    within bucket_width tokens of its shortest member.
+    """
+    order = sorted(range(len(encoded)), key=lambda i: len(encoded[i]))
+    bucket = []
+    for i in order:
+        if bucket and (len(bucket) >= batch_size or len(encoded[i]) - len(encoded[bucket[0]]) > bucket_width):
+            yield bucket
+            bucket = []
+        bucket.append(i)
+    if bucket:
+        yield bucket
+
+def predict_top_diseases_batch(texts, k=TOP_K, normalize=True):
+    """
+    Input: list of raw or normalized texts
+    Output: list of top-k predictions, in input order
+    Runs one packed GRU forward per length bucket instead of one per text.
+    """
+    if not texts:
+        return []
+    if normalize:
+        with ThreadPoolExecutor(NORMALIZE_THREADS) as pool:
+            texts = list(pool.map(normalize_text, texts))
+    # Empty input still needs one step for pack_padded_sequence
+    encoded = [vocab.encode(t) or [1] for t in texts]
+
+    results = [None] * len(encoded)
+    k = min(k, num_classes)
+    for bucket in _length_buckets(encoded):
+        logits = _forward([encoded[i] for i in bucket])
+        top_probs, top_idx = torch.topk(softmax(logits, dim=1), k=k, dim=1)
+        for row, i in enumerate(bucket):
+            results[i] = [
+                {"disease": le.classes_[c], "probability": float(p)}
+                for c, p in zip(top_idx[row].tolist(), top_probs[row].tolist())
+            ]
+    return results
+
 if __name__ == "__main__":
+    # Normalizes raw text, so the audio pipeline must be importable too:
+    #     PYTHONPATH=backend python -m backend.ai_models.symptom_nlp.inference
     test = "Mujhe bukhar aur sardi hai"
     print(predict_top_diseases(test))
+    print(predict_top_diseases_batch([test, "fever cough headache", "skin rash itching"]))
@@ -0,0 +1,125 @@
+"""
+Preprocess the symptom NLP datasets once into NumPy shards.
+
+train_symptom_nlp.py otherwise re-parses every CSV/JSON file on each run and
+re-tokenizes and label-encodes every row on each epoch. This writes the
+cleaned, encoded labeled corpus to a directory that training memory-maps
+with --corpus-dir:
+
+    tokens.npy    int32, all token ids back to back
+    offsets.npy   int64, row i is tokens[offsets[i]:offsets[i + 1]]
+    labels.npy    int32, class index per row
+    vocab.npy     compact vocabulary (compact_vocab.py)
+    classes.json  class names, in label order (LabelEncoder.classes_)
+    meta.json     row/token counts and the settings used
+
+Usage (from this directory):
+    python prepare_corpus.py --data-dir dataset --output-dir corpus
+"""
+
+import argparse
+import itertools
+import json
+import os
+
+import numpy as np
+
+try:
+    from backend.ai_models.symptom_nlp.compact_vocab import CompactVocab
+except ImportError:  # run as a script from this directory
+    from compact_vocab import CompactVocab
+
+
+class Corpus:
+    def __init__(self, tokens, offsets, labels, vocab, classes):
+        self.tokens = tokens
+        self.offsets = offsets
+        self.labels = labels
+        self.vocab = vocab
+        self.classes = list(classes)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def row(self, i):
+        return self.tokens[self.offsets[i]:self.offsets[i + 1]]
+
+    def lengths(self):
+        return np.diff(self.offsets)
+
+    def clamp_vocab(self, size):
+        """
+        Copy restricted to the first `size` vocab ids (the most frequent
+        tokens); rarer ids become <UNK>.
+        """
+        vocab = self.vocab if isinstance(self.vocab, CompactVocab) else CompactVocab.from_vocab(self.vocab)
+        vocab = vocab.truncate(size)
+        tokens = np.where(self.tokens >= size, vocab.unk_id, self.tokens).astype(np.int32)
+        return Corpus(tokens, self.offsets, self.labels, vocab, self.classes)
+
+    # ------------------ IO ------------------
+
+    def save(self, out_dir, **meta):
+        os.makedirs(out_dir, exist_ok=True)
+        np.save(os.path.join(out_dir, "tokens.npy"), self.tokens)
+        np.save(os.path.join(out_dir, "offsets.npy"), self.offsets)
+        np.save(os.path.join(out_dir, "labels.npy"), self.labels)
+        vocab = self.vocab if isinstance(self.vocab, CompactVocab) else CompactVocab.from_vocab(self.vocab)
+        vocab.save(os.path.join(out_dir, "vocab.npy"))
+        with open(os.path.join(out_dir, "classes.json"), "w", encoding="utf-8") as f:
+            json.dump(self.classes, f, ensure_ascii=False)
+        meta.update(rows=len(self), tokens=int(len(self.tokens)), vocab_size=len(vocab),
+                    num_classes=len(self.classes))
+        with open(os.path.join(out_dir, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    @classmethod
+    def load(cls, corpus_dir, mmap=True):
+        mode = "r" if mmap else None
+        arrays = [np.load(os.path.join(corpus_dir, f"{name}.npy"), mmap_mode=mode)
+                  for name in ("tokens", "offsets", "labels")]
+        vocab = CompactVocab.load(os.path.join(corpus_dir, "vocab.npy"), mmap=mmap)
+        with open(os.path.join(corpus_dir, "classes.json"), encoding="utf-8") as f:
+            classes = json.load(f)
+        return cls(*arrays, vocab, classes)
+
+
+def encode_corpus(labeled, vocab, classes=None):
+    """
+    Encodes (text, label) pairs with `vocab` into a Corpus. Classes default
+    to the sorted distinct labels, the same order LabelEncoder uses.
+    """
+    classes = sorted({label for _, label in labeled}) if classes is None else list(classes)
+    label_ids = {c: i for i, c in enumerate(classes)}
+
+    seqs = [vocab.encode(text) for text, _ in labeled]
+    offsets = np.zeros(len(seqs) + 1, dtype=np.int64)
+    np.cumsum([len(s) for s in seqs], out=offsets[1:])
+    tokens = np.fromiter(itertools.chain.from_iterable(seqs), dtype=np.int32, count=int(offsets[-1]))
+    labels = np.array([label_ids[label] for _, label in labeled], dtype=np.int32)
+    return Corpus(tokens, offsets, labels, vocab, classes)
+
+
+def main(args):
+    try:
+        from backend.ai_models.symptom_nlp.train_symptom_nlp import Vocab, collect_all_data_multi
+    except ImportError:
+        from train_symptom_nlp import Vocab, collect_all_data_multi
+
+    labeled, all_texts = collect_all_data_multi(args.data_dir)
+    if not labeled: raise SystemExit("No labeled data found.")
+
+    vocab = Vocab(min_freq=1, max_size=args.vocab_size)
+    vocab.build(all_texts)
+    corpus = encode_corpus(labeled, vocab)
+    corpus.save(args.output_dir, data_dir=os.path.abspath(args.data_dir), max_vocab_size=args.vocab_size)
+    print(f"[i] Wrote {len(corpus)} rows, {len(corpus.tokens)} tokens, "
+          f"{len(vocab)} vocab, {len(corpus.classes)} classes to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data-dir", type=str, default="dataset")
+    parser.add_argument("--output-dir", type=str, default="corpus")
+    parser.add_argument("--vocab-size", type=int, default=10000)
+    main(parser.parse_args())
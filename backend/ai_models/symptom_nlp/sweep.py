@@ -0,0 +1,188 @@
+"""
+Parallel hyperparameter sweep for the symptom classifier.
+
+Every configuration in the grid is trained by train_symptom_nlp.train() in
+its own worker process, with a pinned torch thread count, on one shared
+preprocessed corpus (prepare_corpus.py). Smaller --vocab-sizes are applied
+by mapping rarer ids to <UNK>, so the corpus is never re-encoded. Each run
+keeps its best checkpoint and log under <sweep-dir>/<run>/. The
+leaderboard records validation accuracy, checkpoint size and single-text
+latency, and marks the runs on the latency/accuracy Pareto front.
+
+Usage (from repo root):
+    python -m backend.ai_models.symptom_nlp.sweep --corpus-dir corpus \
+        --embed-dims 32 64 --hidden-dims 32 64 128 --lrs 1e-3 3e-3 \
+        --vocab-sizes 2000 5000 10000 --batch-sizes 16 32 --jobs 8
+"""
+
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+GRID_KEYS = ("embed_dim", "hidden_dim", "lr", "vocab_size", "batch_size")
+
+
+def _init_worker(threads):
+    import torch
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+
+
+def run_name(config):
+    return "e{embed_dim}_h{hidden_dim}_lr{lr:g}_v{vocab_size}_b{batch_size}".format(**config)
+
+
+def measure_latency(model_path, corpus_dir, vocab_size, samples=200):
+    """
+    p50/p95 ms of one batch-of-1 forward over validation-like corpus rows.
+    """
+    import numpy as np
+    import torch
+    from backend.ai_models.symptom_nlp.export_onnx import load_eager
+    from backend.ai_models.symptom_nlp.prepare_corpus import Corpus
+
+    model = load_eager(model_path)
+    corpus = Corpus.load(corpus_dir)
+    rng = np.random.default_rng(0)
+    rows = rng.choice(len(corpus), size=min(samples, len(corpus)), replace=False)
+    # Same <UNK> clamping as training with a smaller vocab_size
+    seqs = [torch.as_tensor(np.where(corpus.row(i) >= vocab_size, 1, corpus.row(i)), dtype=torch.long)[None]
+            for i in rows]
+    seqs = [s if s.size(1) else torch.ones(1, 1, dtype=torch.long) for s in seqs]
+
+    timings = []
+    with torch.no_grad():
+        for s in seqs[:10]:  # warmup
+            model(s, torch.tensor([s.size(1)]))
+        for s in seqs:
+            start = time.perf_counter()
+            model(s, torch.tensor([s.size(1)]))
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2], timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+
+
+def run_config(config, base, sweep_dir):
+    """
+    Worker entry: trains one configuration and measures the checkpoint.
+    """
+    from backend.ai_models.symptom_nlp.train_symptom_nlp import build_parser, train
+
+    name = run_name(config)
+    out_dir = os.path.join(sweep_dir, name)
+    os.makedirs(out_dir, exist_ok=True)
+    args = build_parser().parse_args([])
+    vars(args).update(base)
+    vars(args).update(config)
+    args.output_dir = out_dir
+    args.num_workers = 0  # the sweep already fills every core
+
+    with open(os.path.join(out_dir, "train.log"), "w") as log, contextlib.redirect_stdout(log):
+        metrics = train(args)
+
+    model_path = os.path.join(out_dir, "symptom_classifier.pth")
+    result = {"run": name, **config, **metrics}
+    if os.path.exists(model_path):
+        result["model_kb"] = os.path.getsize(model_path) / 1024
+        result["latency_p50_ms"], result["latency_p95_ms"] = measure_latency(
+            model_path, args.corpus_dir, metrics["vocab_size"]
+        )
+    with open(os.path.join(out_dir, "result.json"), "w") as f:
+        json.dump(result, f, indent=2)
+    return result
+
+
+def pareto_front(results):
+    """
+    Names of runs no other run beats on both top-1 accuracy and p50 latency.
+    """
+    timed = [r for r in results if "latency_p50_ms" in r]
+    front = set()
+    for r in timed:
+        dominated = any(
+            o["val_top1"] >= r["val_top1"] and o["latency_p50_ms"] <= r["latency_p50_ms"]
+            and (o["val_top1"] > r["val_top1"] or o["latency_p50_ms"] < r["latency_p50_ms"])
+            for o in timed
+        )
+        if not dominated:
+            front.add(r["run"])
+    return front
+
+
+def write_leaderboard(results, sweep_dir):
+    front = pareto_front(results)
+    results = sorted(results, key=lambda r: (-r["val_top1"], r.get("latency_p50_ms", float("inf"))))
+    for r in results:
+        r["pareto"] = r["run"] in front
+
+    columns = ["run", *GRID_KEYS, "val_top1", "val_top5", "epochs", "params", "model_kb",
+               "latency_p50_ms", "latency_p95_ms", "train_seconds", "pareto"]
+    with open(os.path.join(sweep_dir, "leaderboard.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(results)
+    with open(os.path.join(sweep_dir, "leaderboard.json"), "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n{'run':<36} {'top1':>6} {'top5':>6} {'KB':>8} {'p50 ms':>7} {'p95 ms':>7}")
+    for r in results:
+        print(f"{r['run']:<36} {r['val_top1']:6.4f} {r['val_top5']:6.4f} {r.get('model_kb', 0):8.1f} "
+              f"{r.get('latency_p50_ms', float('nan')):7.3f} {r.get('latency_p95_ms', float('nan')):7.3f}"
+              f"{'  *' if r['pareto'] else ''}")
+    print("(* = latency/accuracy Pareto front)")
+
+
+def main(args):
+    if not args.corpus_dir or not os.path.isdir(args.corpus_dir):
+        raise SystemExit("--corpus-dir must point at prepare_corpus.py output")
+    os.makedirs(args.sweep_dir, exist_ok=True)
+
+    grid = [dict(zip(GRID_KEYS, values)) for values in itertools.product(
+        args.embed_dims, args.hidden_dims, args.lrs, args.vocab_sizes, args.batch_sizes
+    )]
+    jobs = args.jobs or max(1, (os.cpu_count() or 1) // args.threads)
+    base = {"corpus_dir": args.corpus_dir, "epochs": args.epochs}
+    print(f"[i] {len(grid)} configurations, {jobs} parallel runs x {args.threads} thread(s)")
+
+    # Inherited by the spawned workers before they import torch
+    os.environ["OMP_NUM_THREADS"] = str(args.threads)
+    os.environ["MKL_NUM_THREADS"] = str(args.threads)
+
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(args.threads,)) as pool:
+        futures = {pool.submit(run_config, config, base, args.sweep_dir): config for config in grid}
+        for fut in as_completed(futures):
+            name = run_name(futures[fut])
+            try:
+                result = fut.result()
+            except Exception as e:
+                print(f"[Warning] {name} failed: {e}")
+                continue
+            results.append(result)
+            print(f"[i] {len(results)}/{len(grid)} {name}: top1 {result['val_top1']:.4f} "
+                  f"p50 {result.get('latency_p50_ms', float('nan')):.3f} ms")
+
+    if results:
+        write_leaderboard(results, args.sweep_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus-dir", type=str, required=True)
+    parser.add_argument("--sweep-dir", type=str, default="sweeps")
+    parser.add_argument("--epochs", type=int, default=8)
+    parser.add_argument("--embed-dims", type=int, nargs="+", default=[32, 64, 128])
+    parser.add_argument("--hidden-dims", type=int, nargs="+", default=[32, 64, 128])
+    parser.add_argument("--lrs", type=float, nargs="+", default=[1e-3, 3e-3])
+    parser.add_argument("--vocab-sizes", type=int, nargs="+", default=[2000, 5000, 10000])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 32])
+    parser.add_argument("--threads", type=int, default=1, help="torch threads per run")
+    parser.add_argument("--jobs", type=int, default=0, help="parallel runs (default: cores / threads)")
+    main(parser.parse_args())
@@ -3,13 +3,16 @@ CPU-friendly Symptom -> Disease classifier
 small GRU-based RNN, trained from scratch
 - Loads all datasets
 - Dynamic augmentation: synonym replacement, symptom dropout, swaps, label mismatch
+  (done per item in DataLoader workers, --num-workers)
 - Partial train/val swap each epoch for regularization
+- Length-bucketed batches padded only to the batch maximum (--fixed-padding for the old behaviour)
 - Early stopping and LR scheduling
+- Optional precomputed corpus (prepare_corpus.py) via --corpus-dir
 
 Usage: python train_symptom_nlp.py --data-dir dataset --epochs 10 --batch-size 32 --force-cpu
 """
 
-import os, json, argparse, random, re
+import os, json, argparse, random, re, functools, time
 from collections import Counter
 
 import numpy as np
@@ -21,6 +24,13 @@ import torch
 from torch import nn
 from torch.utils.data import Dataset, DataLoader
 
+try:
+    from backend.ai_models.symptom_nlp.compact_vocab import CompactVocab
+    from backend.ai_models.symptom_nlp.prepare_corpus import Corpus, encode_corpus
+except ImportError:  # run as a script from this directory
+    from compact_vocab import CompactVocab
+    from prepare_corpus import Corpus, encode_corpus
+
 #utilities
 def clean_text(s):
     if not isinstance(s,str): return ""
@@ -54,6 +64,37 @@ def augment_text(text,num_aug=1):
         augmented.append(" ".join(new_tokens))
     return augmented
 
+# same augmentations on token-id arrays (precomputed corpus)
+def synonym_ids(vocab):
+    """token id -> list of id arrays for its MED_SYNONYMS replacements"""
+    table={}
+    for tok,syns in MED_SYNONYMS.items():
+        tok_ids=vocab.encode(tok)
+        if len(tok_ids)!=1 or tok_ids[0]==1: continue
+        table[tok_ids[0]]=[np.asarray(vocab.encode(s),dtype=np.int32) for s in syns]
+    return table
+
+def augment_ids(ids,synonyms,rng,p_syn=0.3,p_del=0.1,p_swap=0.3):
+    """augment_text for an int array: synonym replacement, deletion, swap"""
+    ids=np.asarray(ids,dtype=np.int32)
+    if synonyms:
+        hit=np.isin(ids,list(synonyms))&(rng.random(len(ids))<p_syn)
+        if hit.any():
+            ids=np.concatenate([synonyms[t][rng.integers(len(synonyms[t]))] if h else [t]
+                                for t,h in zip(ids.tolist(),hit.tolist())]).astype(np.int32)
+    ids=drop_and_swap_ids(ids,rng,p_del,p_swap,keep_empty=True)
+    return ids
+
+def drop_and_swap_ids(ids,rng,p_drop=0.3,p_swap=0.2,keep_empty=False):
+    """token dropout + one random swap; falls back to the input if all dropped"""
+    out=ids[rng.random(len(ids))>p_drop]
+    if not len(out) and not keep_empty: return np.array(ids,dtype=np.int32)
+    out=np.array(out,dtype=np.int32)
+    if len(out)>1 and rng.random()<p_swap:
+        i1,i2=rng.choice(len(out),2,replace=False)
+        out[i1],out[i2]=out[i2],out[i1]
+    return out
+
 #load labeled data
 def load_labeled_from_disease_csv_multi(path):
     df = pd.read_csv(path)
@@ -157,15 +198,121 @@ class SymptomDataset(Dataset):
     def __len__(self): return len(self.encoded)
     def __getitem__(self,idx): return self.encoded[idx]
 
-def collate_batch(batch,max_len=50):
+class AugmentedDataset(Dataset):
+    """
+    One epoch of augmented training rows, produced on the fly in DataLoader
+    workers. Item i<n is row i with dropout/swap (10% label mismatch); item
+    n+i is the synonym augmentation of row i. `overrides` replaces items
+    with rows swapped in from validation.
+    """
+    def __init__(self,rows,synonyms,seed=42,mismatch=0.1):
+        self.rows=rows
+        self.synonyms=synonyms
+        self.seed=seed
+        self.mismatch=mismatch
+        self.epoch=0
+        self.overrides={}
+        # per-label index tables: row labels sorted, plus each label's slice
+        labels=np.array([lab for _,lab in rows],dtype=np.int64)
+        self.sorted_labels=np.sort(labels)
+        num_labels=int(labels.max())+1 if len(labels) else 0
+        self.label_count=np.bincount(labels,minlength=num_labels)
+        self.label_start=np.concatenate([[0],np.cumsum(self.label_count)[:-1]]).astype(np.int64)
+        self.reseed(0)
+    def set_epoch(self,epoch,overrides=None):
+        self.epoch=epoch
+        self.overrides=overrides or {}
+        self.reseed(0)
+    def reseed(self,worker_id):
+        self.rng=np.random.default_rng([self.seed,self.epoch,worker_id])
+    def other_label(self,label):
+        # uniform over rows whose label differs, i.e. frequency-weighted like
+        # random.choice([lab for lab in labels if lab!=label]), but O(1)
+        others=len(self.sorted_labels)-self.label_count[label]
+        if others<=0: return label
+        j=int(self.rng.integers(others))
+        if j>=self.label_start[label]: j+=int(self.label_count[label])
+        return int(self.sorted_labels[j])
+    def __len__(self): return 2*len(self.rows)
+    def lengths(self):
+        # pre-augmentation lengths, close enough for bucketing
+        n=len(self.rows)
+        return [len(self.overrides[i][0]) if i in self.overrides else len(self.rows[i%n][0]) for i in range(2*n)]
+    def __getitem__(self,idx):
+        if idx in self.overrides:
+            ids,label=self.overrides[idx]
+        elif idx<len(self.rows):
+            ids,label=self.rows[idx]
+            ids=drop_and_swap_ids(ids,self.rng)
+            if self.rng.random()<self.mismatch: label=self.other_label(label)
+        else:
+            src,label=self.rows[idx-len(self.rows)]
+            ids=augment_ids(src,self.synonyms,self.rng)
+            if not len(ids): ids=src
+        return torch.tensor(ids,dtype=torch.long),int(label)
+
+def seed_worker(worker_id):
+    torch.utils.data.get_worker_info().dataset.reseed(worker_id+1)
+
+class IdsDataset(Dataset):
+    """(token id array, class index) rows, already encoded"""
+    def __init__(self,rows):
+        self.rows=rows
+    def __len__(self): return len(self.rows)
+    def lengths(self): return [len(ids) for ids,_ in self.rows]
+    def __getitem__(self,idx):
+        ids,label=self.rows[idx]
+        return torch.tensor(ids,dtype=torch.long),int(label)
+
+class BucketBatchSampler(torch.utils.data.Sampler):
+    """
+    Batches of similar-length items so dynamic padding stays tight.
+    shuffle: items are shuffled, cut into pools of batch_size*pool_batches,
+    each pool sorted by length and split into batches, and the batches
+    shuffled. Without shuffle, batches follow one global length sort.
+    """
+    def __init__(self,lengths,batch_size,shuffle=True,pool_batches=50,seed=42):
+        self.lengths=np.asarray(lengths)
+        self.batch_size=batch_size
+        self.shuffle=shuffle
+        self.pool_batches=pool_batches
+        self.seed=seed
+        self.epoch=0
+    def set_lengths(self,lengths): self.lengths=np.asarray(lengths)
+    def _batches(self):
+        if not self.shuffle:
+            order=np.argsort(self.lengths,kind="stable")
+            return [order[i:i+self.batch_size] for i in range(0,len(order),self.batch_size)]
+        rng=np.random.default_rng([self.seed,self.epoch])
+        self.epoch+=1
+        order=rng.permutation(len(self.lengths))
+        pool=self.batch_size*self.pool_batches
+        batches=[]
+        for start in range(0,len(order),pool):
+            chunk=order[start:start+pool]
+            chunk=chunk[np.argsort(self.lengths[chunk],kind="stable")]
+            batches+=[chunk[i:i+self.batch_size] for i in range(0,len(chunk),self.batch_size)]
+        return [batches[i] for i in rng.permutation(len(batches))]
+    def __iter__(self):
+        for batch in self._batches(): yield batch.tolist()
+    def __len__(self): return (len(self.lengths)+self.batch_size-1)//self.batch_size
+
+def collate_batch(batch,max_len=50,dynamic=False):
+    """
+    Pads to max_len, or with dynamic=True only to the longest row in the
+    batch (still capped at max_len; max_len=None means no cap).
+    """
     ids,labels=zip(*batch)
-    padded=torch.zeros(len(ids),max_len,dtype=torch.long)
-    lengths=[min(len(seq),max_len) for seq in ids]
+    lengths=[len(seq) if max_len is None else min(len(seq),max_len) for seq in ids]
+    width=max(lengths) if dynamic else max_len
+    padded=torch.zeros(len(ids),width,dtype=torch.long)
     for i,seq in enumerate(ids):
-        end=min(len(seq),max_len)
+        end=lengths[i]
         padded[i,:end]=seq[:end]
     return padded,torch.tensor(lengths,dtype=torch.long),torch.tensor(labels,dtype=torch.long)
 
+dynamic_collate=functools.partial(collate_batch,dynamic=True)
+
 # model
 class SymptomClassifier(nn.Module):
     def __init__(self,vocab_size,embed_dim,hidden_dim,num_classes,pad_idx=0,dropout=0.3):
@@ -202,27 +349,47 @@ def evaluate(model,dataloader,device):
     return top1_sum/total if total else 0.0, top5_sum/total if total else 0.0
 
 # Main
-def main(args):
+def train(args):
+    """
+    Trains one configuration; returns the best epoch's validation metrics.
+    The best checkpoint is written to args.output_dir.
+    """
+    start=time.perf_counter()
     random.seed(42)
     np.random.seed(42)
     torch.manual_seed(42)
 
-    # Load datasets
-    labeled, all_texts = collect_all_data_multi(args.data_dir)
-    if not labeled: raise SystemExit("No labeled data found.")
-    print(f"[i] Total labeled rows: {len(labeled)}")
-
-    vocab = Vocab(min_freq=1,max_size=args.vocab_size)
-    vocab.build(all_texts)
+    # Load datasets: precomputed shards (prepare_corpus.py) or raw files
+    if args.corpus_dir:
+        corpus=Corpus.load(args.corpus_dir)
+        print(f"[i] Loaded {len(corpus)} encoded rows from {args.corpus_dir}")
+        if args.vocab_size+2<len(corpus.vocab):
+            # ids are frequency-ranked, so this matches Vocab(max_size=...)
+            corpus=corpus.clamp_vocab(args.vocab_size+2)
+    else:
+        labeled, all_texts = collect_all_data_multi(args.data_dir)
+        if not labeled: raise SystemExit("No labeled data found.")
+        vocab = Vocab(min_freq=1,max_size=args.vocab_size)
+        vocab.build(all_texts)
+        corpus=encode_corpus(labeled,vocab)
+    if not len(corpus): raise SystemExit("No labeled data found.")
+    print(f"[i] Total labeled rows: {len(corpus)}")
+
+    vocab=corpus.vocab
     le=LabelEncoder()
-    le.fit([lab for _,lab in labeled])
+    le.classes_=np.array(corpus.classes)
     num_classes=len(le.classes_)
     print(f"[i] Vocab size: {len(vocab)}, classes: {num_classes}")
+    synonyms=synonym_ids(vocab)
 
-    # Synthetic test split
-    synthetic_test=create_synthetic_test(labeled,fraction=0.2)
-    train_samples=[s for s in labeled if s not in synthetic_test]
-    val_samples=synthetic_test
+    # Synthetic test split (rows identical to a val row stay out of train)
+    rows=[(corpus.row(i),int(corpus.labels[i])) for i in range(len(corpus))]
+    val_idx=set(random.sample(range(len(rows)),max(1,int(len(rows)*0.2))))
+    val_samples=[rows[i] for i in sorted(val_idx)]
+    val_keys={(ids.tobytes(),lab) for ids,lab in val_samples}
+    train_samples=[r for r in rows if (r[0].tobytes(),r[1]) not in val_keys]
+    train_set=AugmentedDataset(train_samples,synonyms,seed=42)
+    train_sampler=BucketBatchSampler(train_set.lengths(),args.batch_size,shuffle=True,seed=42)
 
     device=torch.device("cpu")
     model=SymptomClassifier(len(vocab),args.embed_dim,args.hidden_dim,num_classes,dropout=0.3)
@@ -231,39 +398,33 @@ def main(args):
     scheduler=torch.optim.lr_scheduler.StepLR(optimizer,step_size=3,gamma=0.7)
     criterion=nn.CrossEntropyLoss()
     best_val,wait,patience=0,0,3
+    best_top5,epochs_run=0,0
     swap_fraction=0.1
 
     for epoch in range(1,args.epochs+1):
-        epoch_train=[]
-        # Augment + random dropout/mismatch/swap
-        for text,label in train_samples:
-            tokens=text.split()
-            tokens=[t for t in tokens if random.random()>0.3]
-            if len(tokens)>1 and random.random()<0.2:
-                i1,i2=random.sample(range(len(tokens)),2)
-                tokens[i1],tokens[i2]=tokens[i2],tokens[i1]
-            new_text=" ".join(tokens) if tokens else text
-            # label mismatch 10%
-            if random.random()<0.1:
-                new_label=random.choice([lab for _,lab in train_samples if lab!=label])
-                epoch_train.append((new_text,new_label))
-            else: epoch_train.append((new_text,label))
-            # synonym augment
-            for aug in augment_text(text,num_aug=1):
-                epoch_train.append((aug,label))
-
-        # Partial train/val swap
-        num_swap_train=int(len(epoch_train)*swap_fraction)
+        # Partial train/val swap; augmentation (dropout/swap/mismatch/synonyms)
+        # happens in the loader workers. Val receives the un-augmented row.
+        num_swap_train=int(len(train_set)*swap_fraction)
         num_swap_val=int(len(val_samples)*swap_fraction)
-        swap_train_idx=random.sample(range(len(epoch_train)),num_swap_train)
+        swap_train_idx=random.sample(range(len(train_set)),num_swap_train)
         swap_val_idx=random.sample(range(len(val_samples)),num_swap_val)
+        overrides={}
         for t_idx,v_idx in zip(swap_train_idx,swap_val_idx):
-            epoch_train[t_idx], val_samples[v_idx]=val_samples[v_idx], epoch_train[t_idx]
-
-        train_loader=DataLoader(SymptomDataset(epoch_train,le,vocab),
-                                batch_size=args.batch_size,shuffle=True,collate_fn=collate_batch)
-        val_loader=DataLoader(SymptomDataset(val_samples,le,vocab),
-                              batch_size=args.batch_size,shuffle=False,collate_fn=collate_batch)
+            overrides[t_idx]=val_samples[v_idx]
+            val_samples[v_idx]=train_samples[t_idx%len(train_samples)]
+        train_set.set_epoch(epoch,overrides)
+        val_set=IdsDataset(val_samples)
+
+        if args.fixed_padding:
+            train_loader=DataLoader(train_set,batch_size=args.batch_size,shuffle=True,collate_fn=collate_batch,
+                                    num_workers=args.num_workers,worker_init_fn=seed_worker if args.num_workers else None)
+            val_loader=DataLoader(val_set,batch_size=args.batch_size,shuffle=False,collate_fn=collate_batch)
+        else:
+            train_sampler.set_lengths(train_set.lengths())
+            train_loader=DataLoader(train_set,batch_sampler=train_sampler,collate_fn=dynamic_collate,
+                                    num_workers=args.num_workers,worker_init_fn=seed_worker if args.num_workers else None)
+            val_loader=DataLoader(val_set,batch_sampler=BucketBatchSampler(val_set.lengths(),args.batch_size,shuffle=False),
+                                  collate_fn=dynamic_collate)
 
         # Train step
         model.train()
@@ -282,14 +443,18 @@ def main(args):
         val1,val5=evaluate(model,val_loader,device)
         print(f"Epoch {epoch:02d} | Train Loss: {avg_loss:.4f} | Val Top1: {val1:.4f} | Val Top5: {val5:.4f}")
         scheduler.step()
+        epochs_run=epoch
 
         if val1>best_val:
-            best_val=val1
+            best_val,best_top5=val1,val5
             wait=0
             os.makedirs(args.output_dir,exist_ok=True)
             torch.save(model.state_dict(),os.path.join(args.output_dir,"symptom_classifier.pth"))
             import pickle
-            with open(os.path.join(args.output_dir,"vocab.pkl"),"wb") as f: pickle.dump(vocab,f)
+            if isinstance(vocab,Vocab):
+                with open(os.path.join(args.output_dir,"vocab.pkl"),"wb") as f: pickle.dump(vocab,f)
+                CompactVocab.from_vocab(vocab).save(os.path.join(args.output_dir,"vocab.npy"))
+            else: vocab.save(os.path.join(args.output_dir,"vocab.npy"))
             with open(os.path.join(args.output_dir,"label_encoder.pkl"),"wb") as f: pickle.dump(le,f)
             print(f"[i] Saved best model (val acc {best_val:.4f})")
         else:
@@ -299,11 +464,23 @@ def main(args):
                 break
 
     print("[i] Training complete. Best val acc:",best_val)
+    return {
+        "val_top1":best_val,
+        "val_top5":best_top5,
+        "epochs":epochs_run,
+        "vocab_size":len(vocab),
+        "num_classes":num_classes,
+        "params":sum(p.numel() for p in model.parameters()),
+        "train_seconds":time.perf_counter()-start,
+    }
 
-# Entry
-if __name__=="__main__":
+def main(args):
+    train(args)
+
+def build_parser():
     parser=argparse.ArgumentParser()
     parser.add_argument("--data-dir",type=str,default="dataset")
+    parser.add_argument("--corpus-dir",type=str,default=None,help="shards from prepare_corpus.py; skips --data-dir")
     parser.add_argument("--output-dir",type=str,default="output")
     parser.add_argument("--epochs",type=int,default=8)
     parser.add_argument("--batch-size",type=int,default=16)
@@ -312,6 +489,12 @@ if __name__=="__main__":
     parser.add_argument("--lr",type=float,default=1e-3)
     parser.add_argument("--vocab-size",type=int,default=10000)
     parser.add_argument("--force-cpu",action="store_true")
-    args=parser.parse_args()
+    parser.add_argument("--fixed-padding",action="store_true",help="old behaviour: pad every batch to 50, no bucketing")
+    parser.add_argument("--num-workers",type=int,default=min(4,os.cpu_count() or 1),help="augmentation DataLoader workers")
+    return parser
+
+# Entry
+if __name__=="__main__":
+    args=build_parser().parse_args()
     main(args)
 
@@ -1,13 +1,26 @@
-from fastapi import APIRouter, UploadFile, File, Form
+import asyncio
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from pydantic import BaseModel
 from typing import List, Optional
-from backend.audio_pipeline.normalize import normalize_text
-from backend.audio_pipeline.whisper_asr import transcribe_audio
-from backend.ai_models.symptom_nlp.inference import predict_top_diseases
-from backend.ai_models.computer_vision.inference import predict_image
+# Same module names as main.py, so both share one translation batcher/cache
+from audio_pipeline.audio_io import load_audio
+from audio_pipeline.normalize import normalize_text, DECODING_PROFILES, ENDPOINT_PROFILES
+from audio_pipeline.whisper_asr import transcribe_audio_async
+from audio_pipeline.worker_pool import PoolBusyError
+from backend.ai_models.symptom_nlp.inference import predict_top_diseases_batch
+from backend.ai_models.computer_vision.inference import predict_image_async, image_batcher, heads as vision_heads
+from backend.ai_models.computer_vision.architecture import DATASET_TYPES
 from backend.ai_models.severity_engine import compute_severity
 
 router = APIRouter()
 
+MAX_BULK_TEXTS = 2000
+
+# ======================= Schemas =======================
+class BulkTriageRequest(BaseModel):
+    texts: List[str]
+    top_k: int = 5
+
 @router.post("/")
 async def diagnose(
     text: str = Form(""),
@@ -16,24 +29,41 @@ async def diagnose(
     dataset_type: Optional[str] = Form("skin"),  # specify 'chest', 'skin', 'wound'
     vitals: Optional[dict] = Form(None),
     age: Optional[int] = Form(None),
-    comorbidities: Optional[List[str]] = Form(None)
+    comorbidities: Optional[List[str]] = Form(None),
+    decoding_profile: Optional[str] = Form(None)  # 'fast' or 'quality'
 ):
-    # ------------------- Audio transcription -------------------
-    if audio:
-        text = transcribe_audio(audio.file)
+    profile = decoding_profile or ENDPOINT_PROFILES["diagnose"]
+    if profile not in DECODING_PROFILES:
+        raise HTTPException(400, f"decoding_profile must be one of {sorted(DECODING_PROFILES)}")
 
-    # ------------------- Normalize text -------------------
-    normalized_text = normalize_text(text)
+    # ------------------- Audio transcription + normalize -------------------
+    # Whisper runs in the ASR worker pool, translation in a thread; repeated
+    # uploads are served from the transcription cache
+    if audio:
+        audio_data = await asyncio.to_thread(load_audio, await audio.read())
+        try:
+            result = await transcribe_audio_async(audio_data, profile=profile)
+        except PoolBusyError as e:
+            raise HTTPException(503, str(e))
+        except asyncio.TimeoutError:
+            raise HTTPException(504, "Audio transcription timed out")
+        normalized_text = result["normalized_text"]
+    else:
+        normalized_text = await asyncio.to_thread(normalize_text, text, profile)
 
     # ------------------- Symptom NLP prediction -------------------
-    nlp_predictions = predict_top_diseases(normalized_text)
+    # Off the event loop, and without normalizing the text a second time
+    nlp_predictions = (await asyncio.to_thread(predict_top_diseases_batch, [normalized_text], normalize=False))[0]
     top_symptoms = [d["disease"].lower() for d in nlp_predictions]
 
     # ------------------- Computer vision prediction -------------------
     vision_result = None
     if image:
         # dataset_type must be 'chest', 'skin', or 'wound'
-        vision_result = predict_image(image.file, dataset_type)
+        if dataset_type not in DATASET_TYPES:
+            raise HTTPException(400, f"dataset_type must be one of {list(DATASET_TYPES)}")
+        # Batched with other concurrent uploads of the same dataset_type
+        vision_result = await predict_image_async(image.file, dataset_type)
         # Add vision-predicted findings as symptoms for severity
         vision_symptom = f"{dataset_type}_finding_{vision_result['pred_class']}"
         top_symptoms.append(vision_symptom)
@@ -58,3 +88,31 @@ async def diagnose(
 
     return response
 
+@router.get("/vision/stats")
+def vision_stats():
+    """
+    Which CV backbone+head pairs are resident, cache hits/loads/evictions,
+    and the image batcher's batch-size histogram.
+    """
+    return {"heads": vision_heads.stats(), "batcher": image_batcher.stats()}
+
+@router.post("/bulk")
+async def diagnose_bulk(request: BulkTriageRequest):
+    """
+    Scores many symptom texts at once (e.g. nightly re-triage of records).
+    Results are returned in the same order as the input texts.
+    """
+    if len(request.texts) > MAX_BULK_TEXTS:
+        raise HTTPException(400, f"At most {MAX_BULK_TEXTS} texts per request")
+    if request.top_k < 1:
+        raise HTTPException(400, "top_k must be >= 1")
+
+    # Scoring runs in a thread so the event loop stays free
+    predictions = await asyncio.to_thread(predict_top_diseases_batch, request.texts, request.top_k)
+    return {
+        "count": len(predictions),
+        "results": [
+            {"input": text, "top_diseases": preds}
+            for text, preds in zip(request.texts, predictions)
+        ]
+    }
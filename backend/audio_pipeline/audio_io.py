@@ -0,0 +1,78 @@
+"""
+Decode uploaded audio straight into a 16 kHz mono float32 NumPy buffer.
+
+Uploads arrive as FastAPI UploadFile objects (file-like) or raw bytes. They
+are piped through ffmpeg's stdin/stdout, so nothing is spooled to disk and
+Whisper receives an array it does not need to decode again.
+"""
+
+import io
+import subprocess
+from pathlib import Path
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def pcm16_to_float32(chunk: bytes):
+    """
+    Converts little-endian 16-bit PCM bytes into float32 samples in [-1, 1].
+    """
+    usable = len(chunk) - (len(chunk) % 2)
+    return np.frombuffer(chunk[:usable], dtype="<i2").astype(np.float32) / 32768.0
+
+
+def _read_source(source):
+    """
+    Returns the encoded bytes of a path, bytes object or file-like object.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if isinstance(source, (str, Path)):
+        path = Path(source)
+        if not path.exists():
+            raise FileNotFoundError(f"Audio file not found: {source}")
+        return path.read_bytes()
+    if hasattr(source, "read"):
+        if hasattr(source, "seek"):
+            try:
+                source.seek(0)
+            except (OSError, io.UnsupportedOperation):
+                pass
+        data = source.read()
+        if isinstance(data, str):
+            raise TypeError("Audio file object must be opened in binary mode")
+        return data
+    raise TypeError(f"Unsupported audio source: {type(source).__name__}")
+
+
+def decode_audio(data: bytes, sr: int = SAMPLE_RATE):
+    """
+    Decodes any ffmpeg-readable container to mono float32 at `sr` Hz.
+    """
+    if not data:
+        raise ValueError("Empty audio upload")
+    cmd = [
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error", "-threads", "0",
+        "-i", "pipe:0",
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sr),
+        "pipe:1",
+    ]
+    try:
+        proc = subprocess.run(cmd, input=data, capture_output=True, check=True)
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg is not installed or not on PATH")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='ignore').strip()}") from e
+    return pcm16_to_float32(proc.stdout)
+
+
+def load_audio(source, sr: int = SAMPLE_RATE):
+    """
+    Accepts a path, bytes, a file-like object or an already decoded float32
+    array and returns a 16 kHz mono float32 buffer.
+    """
+    if isinstance(source, np.ndarray):
+        return source.astype(np.float32, copy=False)
+    return decode_audio(_read_source(source), sr)
@@ -0,0 +1,103 @@
+"""
+Benchmark: script-aware detect_language vs. plain langdetect.detect.
+
+Runs both over a small corpus of Hinglish / Tanglish / English / native
+script symptom strings and reports per-call latency and how often each path
+gives the label we expect normalize_text to act on.
+
+Usage (from backend/): python -m audio_pipeline.bench_lang_detect --repeats 20
+"""
+
+import argparse
+import re
+import statistics
+import time
+
+import langdetect
+
+from audio_pipeline.lang_detect import detect_language, detect_statistical
+
+# (text, expected) -- 'hi' / 'ta' also stand for Hinglish / Tanglish
+CORPUS = [
+    ("mujhe bukhar hai", "hi"),
+    ("sar dard", "hi"),
+    ("mujhe do din se khansi aur bukhar hai", "hi"),
+    ("pet me bahut dard ho raha hai", "hi"),
+    ("mujhe fever hai aur sar dard", "hi"),
+    ("chakkar aa raha hai aur kamzori", "hi"),
+    ("saans lene me dikkat hai", "hi"),
+    ("ulti aur dast ho rahe hain", "hi"),
+    ("gala kharab hai jukam bhi", "hi"),
+    ("bacche ko raat se tez bukhar", "hi"),
+    ("enakku kaichal irukku", "ta"),
+    ("thalai vali romba irukku", "ta"),
+    ("vayiru vali konjam irukku", "ta"),
+    ("rendu naala irumal and sali", "ta"),
+    ("nenju vali irukkudhu", "ta"),
+    ("enaku thondai vali", "ta"),
+    ("udambu sorvu aagudhu", "ta"),
+    ("moochu vida kashtama irukku", "ta"),
+    ("i have fever since two days", "en"),
+    ("severe chest pain and breathing problem", "en"),
+    ("headache and vomiting", "en"),
+    ("my child has a cough and cold", "en"),
+    ("pain in stomach after eating", "en"),
+    ("feeling dizzy and weak", "en"),
+    ("sore throat with mild fever", "en"),
+    ("swelling on the left leg", "en"),
+    ("मुझे बुखार है", "hi"),
+    ("सिर में बहुत दर्द है", "hi"),
+    ("मुझे खांसी और जुकाम है", "hi"),
+    ("पेट में दर्द", "hi"),
+    ("எனக்கு காய்ச்சல் இருக்கு", "ta"),
+    ("தலை வலி", "ta"),
+    ("வயிறு வலி அதிகமா இருக்கு", "ta"),
+    ("இருமல் மற்றும் சளி", "ta"),
+]
+
+def clean(text):
+    # Same cleaning normalize_text applies before detection
+    text = text.lower()
+    text = re.sub(r"[^a-z\u0900-\u097F\u0B80-\u0BFF0-9\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+def baseline(text):
+    try:
+        return langdetect.detect(text)
+    except Exception:
+        return "en"
+
+def run(name, fn, texts, expected, repeats):
+    timings = []
+    for _ in range(repeats):
+        for t in texts:
+            start = time.perf_counter()
+            fn(t)
+            timings.append((time.perf_counter() - start) * 1e6)
+    labels = [fn(t) for t in texts]
+    correct = sum(1 for got, want in zip(labels, expected) if got == want)
+    timings.sort()
+    print(f"{name:<22} mean {statistics.mean(timings):9.1f} us | "
+          f"p50 {timings[len(timings) // 2]:9.1f} us | "
+          f"p99 {timings[int(len(timings) * 0.99) - 1]:9.1f} us | "
+          f"accuracy {correct}/{len(texts)}")
+    return labels
+
+def main(args):
+    texts = [clean(t) for t, _ in CORPUS]
+    expected = [lang for _, lang in CORPUS]
+
+    base = run("langdetect.detect", baseline, texts, expected, args.repeats)
+    # Measure the cold path too: lru_cache would otherwise hide the fallback cost
+    detect_statistical.cache_clear()
+    fast = run("detect_language", detect_language, texts, expected, args.repeats)
+
+    if args.verbose:
+        for text, want, b, f in zip(texts, expected, base, fast):
+            print(f"  {want} | langdetect={b:<5} fast={f:<3} | {text}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--verbose", action="store_true")
+    main(parser.parse_args())
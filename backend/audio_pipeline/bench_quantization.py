@@ -0,0 +1,122 @@
+"""
+Benchmark: fp32 vs. dynamic int8 Whisper and M2M100 on CPU.
+
+Reports, per model and mode: load RSS growth, serialized model size, mean
+and p95 latency on a fixed test set, and output similarity against the
+fp32 baseline (word-level SequenceMatcher ratio, 1.0 = identical).
+
+Translation uses the built-in sentences below. Whisper needs a folder of
+recordings passed with --audio-dir and is skipped otherwise.
+
+Usage (from backend/): python -m audio_pipeline.bench_quantization --audio-dir samples/
+"""
+
+import argparse
+import difflib
+import gc
+import io
+import statistics
+import time
+from pathlib import Path
+
+import torch
+
+from audio_pipeline.audio_io import load_audio
+from audio_pipeline.model_registry import current_rss_bytes, load_translator, load_whisper
+from audio_pipeline.normalize import generate_translations
+
+# (hf_lang, text)
+TRANSLATION_SET = [
+    ("hi", "मुझे दो दिन से बुखार है"),
+    ("hi", "सिर में बहुत दर्द है और चक्कर आ रहे हैं"),
+    ("hi", "बच्चे को खांसी और जुकाम है"),
+    ("hi", "पेट में दर्द और उल्टी हो रही है"),
+    ("hi", "सांस लेने में तकलीफ है"),
+    ("hi", "छाती में दर्द हो रहा है"),
+    ("ta", "எனக்கு காய்ச்சல் இருக்கு"),
+    ("ta", "தலை வலி அதிகமா இருக்கு"),
+    ("ta", "வயிறு வலி மற்றும் வாந்தி"),
+    ("ta", "இருமல் மற்றும் சளி மூன்று நாளா இருக்கு"),
+    ("ta", "நெஞ்சு வலி இருக்கு"),
+    ("ta", "மூச்சு விட கஷ்டமா இருக்கு"),
+]
+
+AUDIO_EXTS = {".wav", ".mp3", ".m4a", ".ogg", ".webm", ".flac", ".aac"}
+
+def similarity(a, b):
+    return difflib.SequenceMatcher(None, a.lower().split(), b.lower().split()).ratio()
+
+def serialized_mb(model):
+    buf = io.BytesIO()
+    torch.save(model.state_dict(), buf)
+    return buf.tell() / 2**20
+
+def timed_load(loader, quantize):
+    gc.collect()
+    before = current_rss_bytes()
+    model = loader(quantize=quantize)
+    return model, (current_rss_bytes() - before) / 2**20
+
+def run_translation(tokenizer, model):
+    outputs, latencies = [], []
+    with torch.inference_mode():
+        for lang, text in TRANSLATION_SET:
+            start = time.perf_counter()
+            outputs.append(generate_translations(tokenizer, model, lang, [text])[0])
+            latencies.append((time.perf_counter() - start) * 1000)
+    return outputs, latencies
+
+def run_whisper(model, clips):
+    outputs, latencies = [], []
+    with torch.inference_mode():
+        for audio in clips:
+            start = time.perf_counter()
+            outputs.append(model.transcribe(audio, fp16=False).get("text", "").strip())
+            latencies.append((time.perf_counter() - start) * 1000)
+    return outputs, latencies
+
+def report(name, mode, rss_mb, size_mb, latencies, outputs, baseline):
+    latencies = sorted(latencies)
+    sim = statistics.mean(similarity(a, b) for a, b in zip(outputs, baseline))
+    print(f"{name:<8} {mode:<5} | load RSS {rss_mb:8.1f} MB | size {size_mb:8.1f} MB | "
+          f"mean {statistics.mean(latencies):8.1f} ms | p95 {latencies[int(len(latencies) * 0.95) - 1]:8.1f} ms | "
+          f"similarity {sim:.3f}")
+
+def bench_translator():
+    baseline = None
+    for mode in ("fp32", "int8"):
+        (tokenizer, model), rss_mb = timed_load(load_translator, "" if mode == "fp32" else "int8")
+        run_translation(tokenizer, model)  # warmup
+        outputs, latencies = run_translation(tokenizer, model)
+        baseline = baseline or outputs
+        report("m2m100", mode, rss_mb, serialized_mb(model), latencies, outputs, baseline)
+        del tokenizer, model
+
+def bench_whisper(audio_dir):
+    files = sorted(p for p in Path(audio_dir).iterdir() if p.suffix.lower() in AUDIO_EXTS)
+    if not files:
+        print(f"[i] No audio in {audio_dir}, skipping Whisper")
+        return
+    clips = [load_audio(f) for f in files]
+    baseline = None
+    for mode in ("fp32", "int8"):
+        model, rss_mb = timed_load(load_whisper, "" if mode == "fp32" else "int8")
+        if model is None:
+            return
+        outputs, latencies = run_whisper(model, clips)
+        baseline = baseline or outputs
+        report("whisper", mode, rss_mb, serialized_mb(model), latencies, outputs, baseline)
+        del model
+
+def main(args):
+    torch.set_num_threads(args.threads)
+    print(f"[i] torch threads: {torch.get_num_threads()}")
+    bench_translator()
+    if args.audio_dir:
+        bench_whisper(args.audio_dir)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--audio-dir", type=str, default=None)
+    parser.add_argument("--threads", type=int, default=4)
+    main(parser.parse_args())
@@ -0,0 +1,65 @@
+"""
+Benchmark: Whisper on full recordings vs. VAD-trimmed recordings.
+
+For every audio file in --samples it reports how much audio was removed,
+CPU time per request with and without trimming, and a word-level similarity
+between the two transcripts (1.0 = identical).
+
+Usage (from backend/): python -m audio_pipeline.bench_vad --samples path/to/wavs
+"""
+
+import argparse
+import difflib
+import time
+from pathlib import Path
+
+from audio_pipeline.audio_io import load_audio
+from audio_pipeline.vad import trim_silence
+from audio_pipeline.whisper_asr import transcribe_pcm
+
+AUDIO_EXTS = {".wav", ".mp3", ".m4a", ".ogg", ".webm", ".flac", ".aac"}
+
+def similarity(a, b):
+    return difflib.SequenceMatcher(None, a.lower().split(), b.lower().split()).ratio()
+
+def timed(fn, *args):
+    cpu, wall = time.process_time(), time.perf_counter()
+    out = fn(*args)
+    return out, time.process_time() - cpu, time.perf_counter() - wall
+
+def main(args):
+    files = sorted(p for p in Path(args.samples).iterdir() if p.suffix.lower() in AUDIO_EXTS)
+    if not files:
+        raise SystemExit(f"No audio files found in {args.samples}")
+
+    totals = {"full_cpu": 0.0, "vad_cpu": 0.0, "removed": 0.0, "audio": 0.0, "sim": 0.0}
+    print(f"{'file':<28} {'removed':>8} {'cpu full':>9} {'cpu vad':>9} {'similarity':>10}")
+    for f in files:
+        audio = load_audio(f)
+        full_text, full_cpu, _ = timed(transcribe_pcm, audio)
+        (trimmed, stats), trim_cpu, _ = timed(trim_silence, audio)
+        vad_text, vad_cpu, _ = timed(transcribe_pcm, trimmed)
+        vad_cpu += trim_cpu
+        sim = similarity(full_text, vad_text)
+
+        totals["full_cpu"] += full_cpu
+        totals["vad_cpu"] += vad_cpu
+        totals["removed"] += stats["removed_seconds"]
+        totals["audio"] += stats["original_seconds"]
+        totals["sim"] += sim
+        print(f"{f.name[:28]:<28} {stats['removed_ratio']:>7.0%} {full_cpu:>8.2f}s {vad_cpu:>8.2f}s {sim:>10.3f}")
+        if args.verbose and sim < 1.0:
+            print(f"    full: {full_text}\n    vad:  {vad_text}")
+
+    n = len(files)
+    print("-" * 68)
+    print(f"audio removed: {totals['removed']:.1f}s of {totals['audio']:.1f}s "
+          f"({totals['removed'] / totals['audio']:.0%})" if totals["audio"] else "audio removed: 0s")
+    print(f"mean CPU per request: {totals['full_cpu'] / n:.2f}s -> {totals['vad_cpu'] / n:.2f}s")
+    print(f"mean transcript similarity: {totals['sim'] / n:.3f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=str, required=True, help="Folder of sample recordings")
+    parser.add_argument("--verbose", action="store_true")
+    main(parser.parse_args())
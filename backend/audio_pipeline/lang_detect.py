@@ -0,0 +1,105 @@
+"""
+Fast language detection for cleaned symptom text.
+
+normalize_text only ever sees Latin, Devanagari and Tamil characters, so the
+script alone settles most inputs. Romanized text is checked against small
+Hinglish / Tanglish / English marker lexicons, and only text that is still
+ambiguous goes to langdetect (seeded, so it is deterministic, and cached).
+"""
+
+import re
+from functools import lru_cache
+
+import langdetect
+from langdetect import DetectorFactory
+
+DetectorFactory.seed = 0
+
+DEVANAGARI_RE = re.compile(r"[\u0900-\u097F]")
+TAMIL_RE = re.compile(r"[\u0B80-\u0BFF]")
+LATIN_RE = re.compile(r"[a-z]")
+
+# ------------------ Marker lexicons ------------------
+# Deliberately small and unambiguous: words that also read as common English
+# ("me", "to", "so", "hi") are left out.
+HINGLISH_MARKERS = frozenset("""
+mujhe mujhko mera meri mere hamara hai hain tha thi raha rahi rahe hua hui
+bahut bohot aur nahi nahin kya kab kaise dard bukhar bukhaar sar pet khansi
+khaansi jukam zukam sardi ulti dast chakkar kamzori kamjori saans sans gala
+ghabrahat jalan sujan soojan khujli daane pasina thakan dino raat subah
+""".split())
+
+TANGLISH_MARKERS = frozenset("""
+enakku enaku ennaku irukku iruku irukkudhu irukudhu vali valikkudhu valikudhu
+kaichal kaaichal thalai thalaivali vayiru vayitru erichal sali irumal
+moochu vaanthi vandhi romba konjam naala naalaa ennoda illa illai aagudhu
+varudhu udambu nenju thondai kaal mayakkam sorvu veekkam arippu
+""".split())
+
+ENGLISH_MARKERS = frozenset("""
+i have has am is are was my the and with pain fever cough headache since
+days day week weeks feel feeling chest stomach breathing breath vomiting
+cold throat sore severe mild body ache of in for after not very bad high
+blood dizzy weak weakness swelling rash back from also
+""".split())
+
+# Share of letters that must be in a native script to call it that language
+NATIVE_SCRIPT_SHARE = 0.3
+
+# ------------------ Detection ------------------
+
+@lru_cache(maxsize=4096)
+def detect_statistical(text):
+    """
+    Seeded langdetect fallback for text the fast path cannot settle.
+    """
+    try:
+        return langdetect.detect(text)
+    except Exception:
+        return "en"
+
+def detect_by_script(text):
+    """
+    Returns 'hi' or 'ta' when the text is mostly written in a native script,
+    otherwise None.
+    """
+    deva = len(DEVANAGARI_RE.findall(text))
+    tamil = len(TAMIL_RE.findall(text))
+    if not deva and not tamil:
+        return None
+    letters = deva + tamil + len(LATIN_RE.findall(text))
+    native, lang = (deva, "hi") if deva >= tamil else (tamil, "ta")
+    if native / letters >= NATIVE_SCRIPT_SHARE:
+        return lang
+    return None
+
+def detect_romanized(text):
+    """
+    Scores Romanized text against the marker lexicons. Returns the winning
+    language or None when there is no clear winner.
+    """
+    scores = {"hi": 0, "ta": 0, "en": 0}
+    for tok in text.split():
+        if tok in HINGLISH_MARKERS:
+            scores["hi"] += 1
+        elif tok in TANGLISH_MARKERS:
+            scores["ta"] += 1
+        elif tok in ENGLISH_MARKERS:
+            scores["en"] += 1
+    ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+    (best, best_score), (_, runner_up) = ranked[0], ranked[1]
+    if best_score == 0 or best_score == runner_up:
+        return None
+    # Code-mixed input ("mujhe fever hai") should go to translation
+    if best == "en" and (scores["hi"] or scores["ta"]) and best_score < 2 * runner_up:
+        return None
+    return best
+
+def detect_language(text):
+    """
+    Detect the language of cleaned, lower-cased text.
+    Returns an ISO code; 'hi' / 'ta' also cover Hinglish / Tanglish.
+    """
+    if not text:
+        return "en"
+    return detect_by_script(text) or detect_romanized(text) or detect_statistical(text)
@@ -0,0 +1,165 @@
+"""
+Process-wide holder for the heavy audio/translation models.
+
+normalize.py and whisper_asr.py used to load their own M2M100 (and Whisper)
+at import time, so every worker kept two copies of the 418M translator.
+Both modules now ask this registry, which builds each model lazily on first
+use, exactly once per process, and records how much resident memory the
+load cost.
+"""
+
+import os
+import threading
+import time
+
+import torch
+
+# ------------------ Config ------------------
+M2M100_NAME = os.getenv("M2M100_MODEL", "facebook/m2m100_418M")
+WHISPER_SIZE = os.getenv("WHISPER_MODEL", "small")
+DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+# "int8" serves dynamically quantized Linear layers on CPU; "" keeps fp32
+QUANTIZE = os.getenv("MODEL_QUANTIZE", "").lower()
+
+# ------------------ Memory helpers ------------------
+try:
+    import psutil
+    _process = psutil.Process(os.getpid())
+except ImportError:
+    _process = None
+
+
+def current_rss_bytes():
+    """
+    Resident set size of this process, in bytes.
+    """
+    if _process is not None:
+        return _process.memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def parameter_bytes(model):
+    """
+    Bytes held by a torch module's parameters and buffers.
+    """
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+# ------------------ Registry ------------------
+
+class ModelRegistry:
+    """
+    Lazily builds and caches named models. Each loader runs at most once;
+    concurrent callers block on the same lock until it has finished.
+    """
+
+    def __init__(self):
+        self._models = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def get(self, name, loader):
+        if name in self._models:
+            return self._models[name]
+        with self._lock:
+            if name not in self._models:
+                rss_before = current_rss_bytes()
+                started = time.perf_counter()
+                model = loader()
+                self._stats[name] = {
+                    "load_seconds": round(time.perf_counter() - started, 2),
+                    "rss_delta_mb": round((current_rss_bytes() - rss_before) / 2**20, 1),
+                }
+                self._models[name] = model
+        return self._models[name]
+
+    def loaded(self):
+        return list(self._models)
+
+    def memory_report(self):
+        """
+        Per-model memory: RSS growth observed while loading plus the size of
+        the torch parameters, and the current RSS of the whole process.
+        """
+        report = {}
+        for name, stats in self._stats.items():
+            entry = dict(stats)
+            model = self._models.get(name)
+            modules = model if isinstance(model, tuple) else (model,)
+            params = sum(parameter_bytes(m) for m in modules if isinstance(m, torch.nn.Module))
+            entry["param_mb"] = round(params / 2**20, 1)
+            report[name] = entry
+        return {"quantize": QUANTIZE or "fp32", "process_rss_mb": round(current_rss_bytes() / 2**20, 1), "models": report}
+
+
+registry = ModelRegistry()
+
+# ------------------ Quantization ------------------
+
+def quantize_int8(model):
+    """
+    Dynamic int8 quantization of every Linear layer (weights stored as int8,
+    activations quantized on the fly). CPU only.
+    """
+    # Whisper subclasses nn.Linear only to cast weights for fp16; on CPU the
+    # plain layer is equivalent, and quantize_dynamic matches exact types.
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear) and type(module) is not torch.nn.Linear:
+            module.__class__ = torch.nn.Linear
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _maybe_quantize(model, quantize):
+    if quantize != "int8":
+        return model
+    if DEVICE != "cpu":
+        print("[Warning] int8 quantization is CPU-only; keeping fp32 on CUDA")
+        return model
+    return quantize_int8(model)
+
+# ------------------ Loaders ------------------
+
+def load_translator(quantize=None):
+    """
+    Builds a fresh M2M100 (tokenizer, model) pair. Prefer get_translator();
+    this is for benchmarks that need fp32 and int8 side by side.
+    """
+    from transformers import M2M100ForConditionalGeneration, M2M100Tokenizer
+    tokenizer = M2M100Tokenizer.from_pretrained(M2M100_NAME)
+    model = M2M100ForConditionalGeneration.from_pretrained(M2M100_NAME)
+    model.eval()
+    model = _maybe_quantize(model, QUANTIZE if quantize is None else quantize)
+    return tokenizer, model
+
+
+def load_whisper(quantize=None):
+    """
+    Builds a fresh Whisper model, or returns None if loading fails.
+    """
+    import whisper
+    try:
+        model = whisper.load_model(WHISPER_SIZE).to(DEVICE)
+    except Exception as e:
+        print(f"[Warning] Whisper model load failed: {e}")
+        return None
+    model.eval()
+    return _maybe_quantize(model, QUANTIZE if quantize is None else quantize)
+
+
+def get_translator():
+    """
+    Returns the shared (tokenizer, model) pair for M2M100.
+    """
+    return registry.get("m2m100", load_translator)
+
+
+def get_whisper():
+    """
+    Returns the shared Whisper model, or None if it could not be loaded.
+    """
+    return registry.get("whisper", load_whisper)
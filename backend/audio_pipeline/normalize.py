@@ -1,8 +1,13 @@
-import torch
-import whisper
+import os
 import re
-from pathlib import Path
-import langdetect
+import threading
+from collections import Counter
+
+from audio_pipeline.lang_detect import detect_language
+from audio_pipeline.model_registry import get_translator
+from audio_pipeline.worker_pool import asr_pool
+from utils.micro_batcher import MicroBatcher
+from utils.tiered_cache import TieredCache
 
 # ------------------ Optional Google Translate ------------------
 try:
@@ -12,11 +17,6 @@ try:
 except Exception:
     use_google = False
 
-# ------------------ HuggingFace Multilingual Translation ------------------
-from transformers import M2M100ForConditionalGeneration, M2M100Tokenizer
-tokenizer = M2M100Tokenizer.from_pretrained("facebook/m2m100_418M")
-hf_model = M2M100ForConditionalGeneration.from_pretrained("facebook/m2m100_418M")
-
 # ------------------ Indic NLP transliteration ------------------
 try:
     from indicnlp.transliterate.unicode_transliterate import ItransTransliterator
@@ -25,13 +25,43 @@ except ImportError:
     print("[Warning] Indic NLP not installed. Install via 'pip install indic-nlp-library'")
     use_indicnlp = False
 
-# ------------------ Device setup ------------------
-device = "cuda" if torch.cuda.is_available() else "cpu"
-try:
-    whisper_model = whisper.load_model("small").to(device)
-except Exception as e:
-    print(f"[Warning] Whisper model load failed: {e}")
-    whisper_model = None
+# ------------------ Translation cache ------------------
+# Health workers send the same short complaints over and over; remember the
+# English output per (language, cleaned text). Set TRANSLATION_CACHE_DB to a
+# file path to keep the cache across restarts.
+translation_cache = TieredCache(
+    "translation-cache",
+    max_entries=int(os.getenv("TRANSLATION_CACHE_SIZE", "4096")),
+    db_path=os.getenv("TRANSLATION_CACHE_DB") or None,
+)
+
+# ------------------ Decoding profiles ------------------
+# "fast": greedy, new tokens capped in proportion to the input length.
+# "quality": beam search, for when a few hundred extra ms are affordable.
+DECODING_PROFILES = {
+    "fast": {"num_beams": 1, "tokens_per_input_token": 1.5, "min_new_tokens": 8},
+    "quality": {"num_beams": 4, "max_new_tokens": 256},
+}
+DEFAULT_PROFILE = os.getenv("TRANSLATE_PROFILE", "quality")
+# Per-endpoint defaults; a request can still ask for a specific profile
+ENDPOINT_PROFILES = {
+    "process_symptoms": os.getenv("PROCESS_SYMPTOMS_PROFILE", "fast"),
+    "diagnose": os.getenv("DIAGNOSE_PROFILE", "quality"),
+}
+# Once this many translations are queued or on their way (ASR jobs in the
+# worker pool), every request is served "fast"
+FAST_PROFILE_BACKLOG = int(os.getenv("TRANSLATE_FAST_BACKLOG", "16"))
+
+_profile_lock = threading.Lock()
+_profile_counts = Counter()
+
+# ------------------ Segmentation settings ------------------
+# Inputs longer than this many words are translated sentence by sentence
+SEGMENT_MIN_WORDS = int(os.getenv("TRANSLATE_SEGMENT_MIN_WORDS", "30"))
+# No segment sent to M2M100 is longer than this (well under its 1024 tokens)
+MAX_SEGMENT_WORDS = int(os.getenv("TRANSLATE_MAX_SEGMENT_WORDS", "40"))
+SENTENCE_SPLIT_RE = re.compile(r"[.!?;\u0964\u0965\n]+")
+CLAUSE_SPLIT_RE = re.compile(r"[,:]+")
 
 # ------------------ Helpers ------------------
 
@@ -47,89 +77,208 @@ def transliterate_roman_to_native(text, lang_code):
     except:
         return text
 
-def translate_hf(text, src_lang):
+def _generate_kwargs(profile, input_len):
+    settings = DECODING_PROFILES[profile]
+    if "tokens_per_input_token" in settings:
+        max_new = int(input_len * settings["tokens_per_input_token"]) + settings["min_new_tokens"]
+    else:
+        max_new = settings["max_new_tokens"]
+    return {"num_beams": settings["num_beams"], "max_new_tokens": max_new, "do_sample": False}
+
+def generate_translations(tokenizer, hf_model, hf_lang, texts, profile="quality"):
     """
-    Translate text to English using HuggingFace M2M100.
+    Translate a list of same-language texts to English with one padded
+    generate() call, using the given decoding profile.
     """
-    hf_lang = src_lang if src_lang in ["hi", "ta", "en"] else "hi"
     tokenizer.src_lang = hf_lang
-    encoded = tokenizer(text, return_tensors="pt")
+    encoded = tokenizer(texts, return_tensors="pt", padding=True)
     generated = hf_model.generate(
         **encoded,
-        forced_bos_token_id=tokenizer.get_lang_id("en")
+        forced_bos_token_id=tokenizer.get_lang_id("en"),
+        **_generate_kwargs(profile, encoded["input_ids"].shape[1])
     )
-    decoded = tokenizer.batch_decode(generated, skip_special_tokens=True)[0]
-    return decoded.lower()
+    decoded = tokenizer.batch_decode(generated, skip_special_tokens=True)
+    return [d.lower() for d in decoded]
+
+def _translate_batch(key, texts):
+    # Runs on the batcher thread only, so setting tokenizer.src_lang is safe
+    hf_lang, profile = key
+    tokenizer, hf_model = get_translator()
+    return generate_translations(tokenizer, hf_model, hf_lang, texts, profile)
+
+# Concurrent normalize_text calls are grouped by source language and
+# decoding profile and translated together instead of one generate() per
+# request.
+translation_batcher = MicroBatcher(
+    _translate_batch,
+    max_batch_size=int(os.getenv("TRANSLATE_MAX_BATCH", "8")),
+    max_wait_ms=float(os.getenv("TRANSLATE_MAX_WAIT_MS", "10")),
+    name="m2m100-batcher",
+)
+
+def resolve_profile(profile=None):
+    """
+    Returns the decoding profile to use: the requested one (or the default),
+    dropped to "fast" while translation or ASR is backed up.
+    """
+    profile = profile or DEFAULT_PROFILE
+    if profile not in DECODING_PROFILES:
+        raise ValueError(f"Unknown decoding profile '{profile}', expected one of {sorted(DECODING_PROFILES)}")
+    backlog = translation_batcher.pending() + asr_pool.in_flight()
+    downgraded = profile != "fast" and backlog >= FAST_PROFILE_BACKLOG
+    with _profile_lock:
+        _profile_counts[profile] += 1
+        if downgraded:
+            _profile_counts["downgraded_to_fast"] += 1
+    return "fast" if downgraded else profile
+
+def cached_profiles(profile):
+    """
+    Profiles whose cached output can serve a `profile` request, best first:
+    a "quality" result is served for either profile.
+    """
+    return ["quality"] if profile == "quality" else ["quality", profile]
+
+def profile_stats():
+    with _profile_lock:
+        return {"default": DEFAULT_PROFILE, "fast_backlog": FAST_PROFILE_BACKLOG, "requested": dict(_profile_counts)}
+
+def translate_hf(text, src_lang, profile="quality"):
+    """
+    Translate text to English using HuggingFace M2M100.
+    """
+    hf_lang = src_lang if src_lang in ["hi", "ta", "en"] else "hi"
+    return translation_batcher.submit(text, key=(hf_lang, profile)).result()
+
+def translate_hf_many(texts, src_lang, profile="quality"):
+    """
+    Translate several same-language texts; they are queued together so the
+    batcher can run them through one generate() call.
+    """
+    hf_lang = src_lang if src_lang in ["hi", "ta", "en"] else "hi"
+    futures = translation_batcher.submit_many(texts, key=(hf_lang, profile))
+    return [f.result() for f in futures]
+
+# ------------------ Segmentation ------------------
+
+def clean_text(text):
+    text = text.lower()
+    text = re.sub(r"[^a-z\u0900-\u097F\u0B80-\u0BFF0-9\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
 
-def normalize_text(text):
+def split_segments(text, max_words=MAX_SEGMENT_WORDS):
+    """
+    Splits raw text into sentences, long sentences into clauses, and
+    anything still longer than max_words into word chunks.
+    """
+    segments = []
+    for sentence in SENTENCE_SPLIT_RE.split(text):
+        if len(sentence.split()) <= max_words:
+            segments.append(sentence)
+            continue
+        for clause in CLAUSE_SPLIT_RE.split(sentence):
+            words = clause.split()
+            for i in range(0, len(words), max_words):
+                segments.append(" ".join(words[i:i + max_words]))
+    return [s for s in segments if s.strip()]
+
+# ------------------ Normalization ------------------
+
+def normalize_text(text, profile=None):
     """
     Detect language, transliterate if Romanized, and translate to English.
     Handles English, Hindi, Tamil, Hinglish, Tanglish automatically.
+    `profile` picks the M2M100 decoding profile ("fast" / "quality").
+    Long transcripts are translated sentence by sentence, as one batch.
     """
+    return normalize_text_detailed(text, profile)[0]
+
+def normalize_text_detailed(text, profile=None):
+    """
+    Like normalize_text, but returns (english_text, profile_used): under
+    load a "quality" request is translated with "fast", and anything that
+    caches the result must key it on what was actually used.
+    """
+    requested = profile or DEFAULT_PROFILE
     if not isinstance(text, str) or not text.strip():
-        return ""
+        return "", requested
     
     # Clean text
-    text = text.lower()
-    text = re.sub(r"[^a-z\u0900-\u097F\u0B80-\u0BFF0-9\s]", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
+    cleaned = clean_text(text)
+    if not cleaned:
+        return "", requested
     
-    try:
-        lang = langdetect.detect(text)
-    except:
-        lang = "en"
+    lang = detect_language(cleaned)
     
     # If already English, pass directly
     if lang == "en":
-        return text
+        return cleaned, requested
     
+    profile = resolve_profile(profile)
+    
+    # Long narrations: translate sentences/clauses instead of one huge
+    # sequence, so cost grows linearly and nothing is truncated
+    if len(cleaned.split()) > SEGMENT_MIN_WORDS:
+        segments = [clean_text(s) for s in split_segments(text)]
+        segments = [s for s in segments if s]
+    else:
+        segments = [cleaned]
+    
+    return " ".join(_translate_segments(segments, lang, profile)), profile
+
+def _translate_segments(segments, lang, profile):
+    """
+    Translates segments in order, serving what it can from the cache
+    (quality entries first) and translating the rest together.
+    """
+    results = [None] * len(segments)
+    missing = []
+    # A request downgraded under load still gets an existing "quality" entry
+    for i, seg in enumerate(segments):
+        for p in cached_profiles(profile):
+            cached = translation_cache.get(f"{lang}:{p}:{seg}")
+            if cached is not None:
+                results[i] = cached
+                break
+        else:
+            missing.append(i)
+    
+    if missing:
+        translated = _translate_to_english([segments[i] for i in missing], lang, profile)
+        for i, out in zip(missing, translated):
+            translation_cache.put(f"{lang}:{profile}:{segments[i]}", out)
+            results[i] = out
+    return results
+
+def _translate_to_english(texts, lang, profile):
+    """
+    Transliterate if Romanized, then translate with Google or M2M100.
+    """
     # Transliterate Romanized Hindi/Tamil to native script
     if lang in ["hi", "ta"]:
-        text = transliterate_roman_to_native(text, lang)
+        texts = [transliterate_roman_to_native(t, lang) for t in texts]
     
     # Try Google Translate if available
     if use_google:
         try:
-            translated = gclient.translate(text, target_language="en")["translatedText"]
-            return translated.lower()
+            translated = gclient.translate(texts, target_language="en")
+            return [t["translatedText"].lower() for t in translated]
         except:
             pass
     
     # Fallback HuggingFace translation
-    return translate_hf(text, lang)
-
-# ------------------ Main transcription ------------------
-
-def transcribe_audio(file_path: str) -> str:
-    """
-    Transcribes audio to text using Whisper and normalizes it to English.
-    """
-    if not Path(file_path).exists():
-        raise FileNotFoundError(f"Audio file not found: {file_path}")
-    
-    if whisper_model is None:
-        raise RuntimeError("Whisper model not loaded properly.")
-    
-    result = whisper_model.transcribe(str(file_path), fp16=torch.cuda.is_available())
-    raw_text = result.get("text", "")
-    
-    normalized_text = normalize_text(raw_text)
-    return normalized_text
+    return translate_hf_many(texts, lang, profile)
 
 # ------------------ Quick test ------------------
 if __name__ == "__main__":
-    test_files = [
-        "test_hinglish.wav",
-        "test_tamil.wav",
-        "test_english.wav",
-        "test_tanglish.wav"
+    samples = [
+        "mujhe bukhar hai aur sar dard",
+        "enakku kaichal irukku",
+        "मुझे खांसी है",
+        "I have chest pain",
     ]
-    
-    for f in test_files:
-        print(f"File: {f}")
-        try:
-            text = transcribe_audio(f)
-            print("Normalized:", text)
-        except Exception as e:
-            print("Error:", e)
+
+    for t in samples:
+        print(f"Input: {t}")
+        print("Normalized:", normalize_text(t))
         print("---")
@@ -0,0 +1,123 @@
+"""
+Incremental Whisper transcription for audio that arrives in chunks.
+
+Audio is buffered as 16 kHz mono float32. Every `step_s` seconds of new audio
+the current window is re-transcribed and a partial transcript is produced.
+Once a window reaches `window_s` it is committed and the next window starts
+`overlap_s` earlier than the end of the last one, so words cut at the
+boundary are heard twice; the repeated words are dropped when merging.
+"""
+
+import os
+import re
+
+import numpy as np
+
+from audio_pipeline.audio_io import SAMPLE_RATE, pcm16_to_float32
+from audio_pipeline.whisper_asr import transcribe_pcm
+
+STREAM_WINDOW_S = float(os.getenv("ASR_STREAM_WINDOW_S", "15"))
+STREAM_OVERLAP_S = float(os.getenv("ASR_STREAM_OVERLAP_S", "2"))
+STREAM_STEP_S = float(os.getenv("ASR_STREAM_STEP_S", "3"))
+
+# Longest run of repeated words looked for when stitching two windows
+MAX_OVERLAP_WORDS = 12
+
+# ------------------ Helpers ------------------
+
+def _word_key(word):
+    return re.sub(r"[^\w]", "", word.lower())
+
+def merge_overlap(committed, new_text):
+    """
+    Appends new_text to committed, dropping the words at the start of
+    new_text that repeat the end of committed.
+    """
+    a, b = committed.split(), new_text.split()
+    if not a:
+        return new_text.strip()
+    a_keys, b_keys = [_word_key(w) for w in a], [_word_key(w) for w in b]
+    for k in range(min(len(a), len(b), MAX_OVERLAP_WORDS), 0, -1):
+        if a_keys[-k:] == b_keys[:k]:
+            return " ".join(a + b[k:])
+    return " ".join(a + b)
+
+# ------------------ Streaming transcriber ------------------
+
+class StreamingTranscriber:
+    def __init__(self, window_s=STREAM_WINDOW_S, overlap_s=STREAM_OVERLAP_S, step_s=STREAM_STEP_S,
+                 transcribe=transcribe_pcm):
+        self.window = int(window_s * SAMPLE_RATE)
+        self.overlap = int(min(overlap_s, window_s / 2) * SAMPLE_RATE)
+        self.step = int(step_s * SAMPLE_RATE)
+        self.transcribe = transcribe
+
+        self._chunks = []
+        self._audio = np.zeros(0, dtype=np.float32)
+        self._samples_received = 0
+        # Odd trailing byte of the last frame; the sample continues in the next one
+        self._leftover = b""
+        self._window_start = 0
+        self._last_partial_at = 0
+        self.committed = ""
+        self.tentative = ""
+
+    @property
+    def seconds_received(self):
+        # Running total: feed() drops audio that no window needs any more
+        return self._samples_received / SAMPLE_RATE
+
+    def _flush_chunks(self):
+        if self._chunks:
+            self._audio = np.concatenate([self._audio] + self._chunks)
+            self._chunks = []
+
+    def feed(self, chunk: bytes):
+        """
+        Adds a chunk of PCM16 audio. Returns the updated partial transcript
+        when enough new audio has arrived to re-transcribe, otherwise None.
+        """
+        chunk = self._leftover + chunk
+        usable = len(chunk) - len(chunk) % 2
+        self._leftover = chunk[usable:]
+        samples = pcm16_to_float32(chunk[:usable])
+        self._chunks.append(samples)
+        self._samples_received += len(samples)
+        received = len(self._audio) + sum(len(c) for c in self._chunks)
+        if received - self._last_partial_at < self.step:
+            return None
+
+        self._flush_chunks()
+        self._last_partial_at = len(self._audio)
+
+        # Commit every full window, then re-transcribe the open one
+        while len(self._audio) - self._window_start >= self.window:
+            end = self._window_start + self.window
+            text = self.transcribe(self._audio[self._window_start:end])
+            self.committed = merge_overlap(self.committed, text)
+            self._window_start = end - self.overlap
+
+        # Drop audio that no window will look at again
+        if self._window_start:
+            self._audio = self._audio[self._window_start:]
+            self._last_partial_at -= self._window_start
+            self._window_start = 0
+
+        tail = self._audio[self._window_start:]
+        self.tentative = self.transcribe(tail) if len(tail) else ""
+        return self.partial_text()
+
+    def partial_text(self):
+        return merge_overlap(self.committed, self.tentative)
+
+    def finish(self):
+        """
+        Transcribes whatever audio is left and returns the full raw transcript.
+        """
+        self._flush_chunks()
+        tail = self._audio[self._window_start:]
+        # A tail that is nothing but the overlap was already transcribed
+        if len(tail) > self.overlap or not self.committed:
+            self.committed = merge_overlap(self.committed, self.transcribe(tail) if len(tail) else "")
+        self.tentative = ""
+        return self.committed
@@ -0,0 +1,145 @@
+"""
+Voice-activity trimming before Whisper.
+
+Rural recordings carry long stretches of silence and background noise, and
+Whisper spends the same compute on those as on speech. trim_silence keeps
+only the voiced spans (with a little padding so word edges survive) and
+reports how much audio it removed.
+
+Uses webrtcvad when it is installed, otherwise a frame-energy detector with
+an adaptive noise floor.
+"""
+
+import threading
+
+import numpy as np
+
+from audio_pipeline.audio_io import SAMPLE_RATE
+
+try:
+    import webrtcvad
+    use_webrtcvad = True
+except ImportError:
+    use_webrtcvad = False
+
+FRAME_MS = 30
+PAD_MS = 200            # kept on both sides of every voiced span
+MIN_SPEECH_MS = 150     # shorter blips are treated as noise
+GAP_MS = 100            # silence left between stitched spans
+ENERGY_MARGIN_DB = 10.0 # above the noise floor counts as speech
+ENERGY_FLOOR_DBFS = -50.0
+NOISE_PERCENTILE = 5    # quietest frames; mostly-speech clips still have a few
+PEAK_PERCENTILE = 95    # loud speech, ignoring clicks
+PEAK_HEADROOM_DB = 20.0 # threshold never sits closer than this to peak speech
+MIN_SPREAD_DB = 12.0    # below this floor-to-peak spread, nothing is trimmed
+
+# ------------------ Frame classifiers ------------------
+
+def _webrtc_flags(audio, sr, frame_len, aggressiveness):
+    vad = webrtcvad.Vad(aggressiveness)
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+    step = frame_len * 2
+    return np.array([
+        vad.is_speech(pcm[i:i + step], sr)
+        for i in range(0, len(pcm) - step + 1, step)
+    ], dtype=bool)
+
+def _energy_flags(audio, frame_len):
+    n = len(audio) // frame_len
+    frames = audio[:n * frame_len].reshape(n, frame_len)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1) + 1e-12)
+    db = 20 * np.log10(rms)
+    noise_floor, peak = np.percentile(db, [NOISE_PERCENTILE, PEAK_PERCENTILE])
+    if peak - noise_floor < MIN_SPREAD_DB:
+        # Continuous speech (or continuous noise): no silence to tell apart
+        return np.ones(n, dtype=bool)
+    # Capped below peak so weak syllables of loud speakers stay voiced
+    threshold = min(noise_floor + ENERGY_MARGIN_DB, peak - PEAK_HEADROOM_DB)
+    return db > max(threshold, ENERGY_FLOOR_DBFS)
+
+# ------------------ Span helpers ------------------
+
+def _runs(flags):
+    """
+    Returns (start, end) frame indices of consecutive True runs.
+    """
+    padded = np.concatenate([[False], flags, [False]]).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return list(zip(edges[::2], edges[1::2]))
+
+def speech_spans(audio, sr=SAMPLE_RATE, aggressiveness=2):
+    """
+    Returns voiced (start_sample, end_sample) spans, padded and merged.
+    """
+    frame_len = sr * FRAME_MS // 1000
+    if len(audio) < frame_len:
+        return [(0, len(audio))]
+    # webrtcvad only accepts 8/16/32/48 kHz
+    if use_webrtcvad and sr in (8000, 16000, 32000, 48000):
+        flags = _webrtc_flags(audio, sr, frame_len, aggressiveness)
+    else:
+        flags = _energy_flags(audio, frame_len)
+
+    min_frames = max(1, MIN_SPEECH_MS // FRAME_MS)
+    pad = sr * PAD_MS // 1000
+    spans = []
+    for start, end in _runs(flags):
+        if end - start < min_frames:
+            continue
+        s = max(0, start * frame_len - pad)
+        e = min(len(audio), end * frame_len + pad)
+        if spans and s <= spans[-1][1]:
+            spans[-1] = (spans[-1][0], e)
+        else:
+            spans.append((s, e))
+    return spans
+
+# ------------------ Trimming ------------------
+
+_totals_lock = threading.Lock()
+_totals = {"requests": 0, "input_seconds": 0.0, "removed_seconds": 0.0}
+
+def trim_silence(audio, sr=SAMPLE_RATE, aggressiveness=2):
+    """
+    Drops non-speech audio. Returns (trimmed_audio, stats). If no speech is
+    found the original audio is returned untouched.
+    """
+    spans = speech_spans(audio, sr, aggressiveness)
+    if spans:
+        gap = np.zeros(sr * GAP_MS // 1000, dtype=audio.dtype)
+        pieces = []
+        for s, e in spans:
+            if pieces:
+                pieces.append(gap)
+            pieces.append(audio[s:e])
+        trimmed = np.concatenate(pieces)
+    else:
+        trimmed = audio
+
+    original_s = len(audio) / sr
+    kept_s = len(trimmed) / sr
+    removed_s = max(0.0, original_s - kept_s)
+    stats = {
+        "backend": "webrtcvad" if use_webrtcvad else "energy",
+        "segments": len(spans),
+        "original_seconds": round(original_s, 2),
+        "kept_seconds": round(kept_s, 2),
+        "removed_seconds": round(removed_s, 2),
+        "removed_ratio": round(removed_s / original_s, 3) if original_s else 0.0,
+    }
+    with _totals_lock:
+        _totals["requests"] += 1
+        _totals["input_seconds"] += original_s
+        _totals["removed_seconds"] += removed_s
+    return trimmed, stats
+
+def vad_totals():
+    """
+    Running totals across all trimmed requests in this process.
+    """
+    with _totals_lock:
+        totals = dict(_totals)
+    totals["removed_ratio"] = round(totals["removed_seconds"] / totals["input_seconds"], 3) if totals["input_seconds"] else 0.0
+    totals["input_seconds"] = round(totals["input_seconds"], 2)
+    totals["removed_seconds"] = round(totals["removed_seconds"], 2)
+    return totals
@@ -1,118 +1,125 @@
+import asyncio
+import hashlib
+import os
 import torch
-import whisper
-import re
-from pathlib import Path
-import langdetect
 
-# ------------------ Optional Google Translate ------------------
-try:
-    from google.cloud import translate_v2 as translate
-    gclient = translate.Client()
-    use_google = True
-except Exception:
-    use_google = False
+from audio_pipeline.audio_io import load_audio
+from audio_pipeline.model_registry import get_whisper
+from audio_pipeline.normalize import cached_profiles, normalize_text_detailed, DEFAULT_PROFILE
+from audio_pipeline.vad import trim_silence
+from audio_pipeline.worker_pool import asr_pool
+from utils.tiered_cache import TieredCache
 
-# ------------------ HuggingFace Multilingual Translation ------------------
-from transformers import M2M100ForConditionalGeneration, M2M100Tokenizer
-tokenizer = M2M100Tokenizer.from_pretrained("facebook/m2m100_418M")
-hf_model = M2M100ForConditionalGeneration.from_pretrained("facebook/m2m100_418M")
+# Drop silence/noise before Whisper (set ASR_VAD=1 to enable by default)
+ASR_VAD = os.getenv("ASR_VAD", "0") == "1"
 
-# ------------------ Indic NLP transliteration ------------------
-try:
-    from indicnlp.transliterate.unicode_transliterate import ItransTransliterator
-    use_indicnlp = True
-except ImportError:
-    print("[Warning] Indic NLP not installed. Install via 'pip install indic-nlp-library'")
-    use_indicnlp = False
+# ------------------ Transcription cache ------------------
+# The medic app re-uploads a recording when the network drops and offline
+# sync replays it; key results on a hash of the decoded audio so a re-encoded
+# or renamed copy still hits. TRANSCRIPT_CACHE_DB enables the disk tier.
+transcription_cache = TieredCache(
+    "transcription-cache",
+    max_entries=int(os.getenv("TRANSCRIPT_CACHE_SIZE", "1024")),
+    db_path=os.getenv("TRANSCRIPT_CACHE_DB") or None,
+)
 
-# ------------------ Device setup ------------------
-device = "cuda" if torch.cuda.is_available() else "cpu"
-try:
-    whisper_model = whisper.load_model("small").to(device)
-except Exception as e:
-    print(f"[Warning] Whisper model load failed: {e}")
-    whisper_model = None
+def audio_digest(audio):
+    return hashlib.sha256(audio.tobytes()).hexdigest()
 
-# ------------------ Helpers ------------------
-
-def transliterate_roman_to_native(text, lang_code):
+def transcription_key(digest, vad=None, profile=None):
     """
-    Converts Romanized Hindi/Tamil (Hinglish/Tanglish) to native script
-    using Indic NLP library.
+    Cache key for a decoded 16 kHz buffer (by audio_digest) plus the
+    settings that change the result.
     """
-    if not use_indicnlp:
-        return text
-    try:
-        return ItransTransliterator.to_script(text, lang_code)
-    except:
-        return text
+    use_vad = ASR_VAD if vad is None else vad
+    return f"{digest}:{'vad' if use_vad else 'full'}:{profile or DEFAULT_PROFILE}"
 
-def translate_hf(text, src_lang):
+def cached_transcription(digest, vad=None, profile=None):
     """
-    Translate text to English using HuggingFace M2M100.
+    Cached result for a `profile` request, or None. Results are stored
+    under the profile normalize_text really used, so a translation
+    downgraded to "fast" under load is never served as "quality".
     """
-    hf_lang = src_lang if src_lang in ["hi", "ta", "en"] else "hi"
-    tokenizer.src_lang = hf_lang
-    encoded = tokenizer(text, return_tensors="pt")
-    generated = hf_model.generate(
-        **encoded,
-        forced_bos_token_id=tokenizer.get_lang_id("en")
-    )
-    decoded = tokenizer.batch_decode(generated, skip_special_tokens=True)[0]
-    return decoded.lower()
+    for p in cached_profiles(profile or DEFAULT_PROFILE):
+        cached = transcription_cache.get(transcription_key(digest, vad, p))
+        if cached is not None:
+            return cached
+    return None
+
+def _store_transcription(digest, vad, result):
+    transcription_cache.put(transcription_key(digest, vad, result["profile"]), result)
+
+# ------------------ Main transcription ------------------
 
-def normalize_text(text):
+def transcribe_pcm(audio, **options) -> str:
     """
-    Detect language, transliterate if Romanized, and translate to English.
+    Transcribes a 16 kHz mono float32 buffer and returns the raw Whisper text.
     """
-    if not isinstance(text, str) or not text.strip():
-        return ""
-    
-    text = text.lower()
-    text = re.sub(r"[^a-z\u0900-\u097F\u0B80-\u0BFF0-9\s]", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    
-    try:
-        lang = langdetect.detect(text)
-    except:
-        lang = "en"
-    
-    # If English, pass directly
-    if lang == "en":
-        return text
-    
-    # Transliterate Romanized Hindi/Tamil to native script
-    if lang in ["hi", "ta"]:
-        text = transliterate_roman_to_native(text, lang)
-    
-    # Try Google Translate if available
-    if use_google:
-        try:
-            translated = gclient.translate(text, target_language="en")["translatedText"]
-            return translated.lower()
-        except:
-            pass
+    whisper_model = get_whisper()
+    if whisper_model is None:
+        raise RuntimeError("Whisper model not loaded properly.")
     
-    # Fallback HuggingFace translation
-    return translate_hf(text, lang)
+    result = whisper_model.transcribe(audio, fp16=torch.cuda.is_available(), **options)
+    return result.get("text", "").strip()
 
-# ------------------ Main transcription ------------------
+def transcribe_raw(audio, vad=None) -> dict:
+    """
+    Whisper only: optional voice-activity trimming, then the raw transcript.
+    This is what the ASR worker pool runs; translation happens in the caller.
+    """
+    vad_stats = None
+    if ASR_VAD if vad is None else vad:
+        audio, vad_stats = trim_silence(audio)
+    return {"raw_text": transcribe_pcm(audio), "vad": vad_stats}
 
-def transcribe_audio(file_path: str) -> str:
+def transcribe_audio_detailed(source, vad=None, profile=None, use_cache=True) -> dict:
     """
-    Transcribes audio to text using Whisper and normalizes it to English.
+    Like transcribe_audio, but also returns the raw Whisper text and, when
+    voice-activity trimming ran, how much audio it removed.
+    `vad` overrides the ASR_VAD setting for this call; `profile` is the
+    translation decoding profile passed to normalize_text; the result's
+    "profile" is the one actually used.
     """
-    if not Path(file_path).exists():
-        raise FileNotFoundError(f"Audio file not found: {file_path}")
+    audio = load_audio(source)
     
-    if whisper_model is None:
-        raise RuntimeError("Whisper model not loaded properly.")
+    digest = audio_digest(audio) if use_cache else None
+    if digest:
+        cached = cached_transcription(digest, vad, profile)
+        if cached is not None:
+            return dict(cached, cached=True)
     
-    result = whisper_model.transcribe(str(file_path), fp16=torch.cuda.is_available())
-    raw_text = result.get("text", "")
+    result = transcribe_raw(audio, vad)
+    result["normalized_text"], result["profile"] = normalize_text_detailed(result["raw_text"], profile)
+    if digest:
+        _store_transcription(digest, vad, result)
+    return dict(result, cached=False)
+
+async def transcribe_audio_async(audio, vad=None, profile=None) -> dict:
+    """
+    transcribe_audio_detailed for async handlers, on a decoded 16 kHz
+    buffer: Whisper runs in the ASR worker pool, translation and the cache
+    in threads of this process. Raises PoolBusyError / asyncio.TimeoutError
+    from the pool.
+    """
+    digest = await asyncio.to_thread(audio_digest, audio)
+    cached = await asyncio.to_thread(cached_transcription, digest, vad, profile)
+    if cached is not None:
+        return dict(cached, cached=True)
     
-    normalized_text = normalize_text(raw_text)
-    return normalized_text
+    result = await asr_pool.run(transcribe_raw, audio, vad)
+    result["normalized_text"], result["profile"] = await asyncio.to_thread(
+        normalize_text_detailed, result["raw_text"], profile)
+    await asyncio.to_thread(_store_transcription, digest, vad, result)
+    return dict(result, cached=False)
+
+def transcribe_audio(source, vad=None, profile=None) -> str:
+    """
+    Transcribes audio to text using Whisper and normalizes it to English.
+    `source` can be a path, raw bytes, a file-like object (e.g. an
+    UploadFile's .file) or a decoded 16 kHz float32 array; uploads are
+    decoded in memory, without a temp file.
+    """
+    return transcribe_audio_detailed(source, vad, profile)["normalized_text"]
 
 # ------------------ Quick test ------------------
 if __name__ == "__main__":
@@ -0,0 +1,236 @@
+"""
+Process pool for Whisper jobs.
+
+Whisper is CPU-bound and holds the GIL for long stretches, so calling it
+from an async handler freezes every other request on the same uvicorn
+worker. The pool keeps Whisper in separate processes (loaded once per
+process through the model registry) and lets handlers await results.
+
+Translation stays in the API process: its micro-batcher and cache only work
+when every request goes through the same instance, and M2M100 releases the
+GIL inside torch, so handlers run it with asyncio.to_thread.
+
+Each job also returns a snapshot of its worker's model memory and VAD
+totals, which stats() reports per worker pid. If a worker dies (e.g. OOM),
+the jobs it took down fail and the pool is rebuilt for the next ones.
+
+Workers are spawned, so each one re-imports the parent's __main__ module:
+launch the API with `uvicorn main:app` (which `python main.py` does), not a
+script that builds the app at import time.
+
+Config:
+    ASR_POOL_SIZE         worker processes (0 = run in a thread of this process)
+    ASR_POOL_QUEUE_DEPTH  jobs allowed to wait on top of the running ones
+    ASR_JOB_TIMEOUT       seconds a handler waits for one job
+    ASR_WORKER_THREADS    torch intra-op threads per worker
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+ASR_POOL_SIZE = int(os.getenv("ASR_POOL_SIZE", "2"))
+ASR_POOL_QUEUE_DEPTH = int(os.getenv("ASR_POOL_QUEUE_DEPTH", "16"))
+ASR_JOB_TIMEOUT = float(os.getenv("ASR_JOB_TIMEOUT", "120"))
+ASR_WORKER_THREADS = int(os.getenv("ASR_WORKER_THREADS", str(max(1, (os.cpu_count() or 1) // max(1, ASR_POOL_SIZE)))))
+
+
+class PoolBusyError(RuntimeError):
+    """Raised when the pool already has `size + queue_depth` jobs in flight."""
+
+
+def _init_worker(threads, warm):
+    import torch
+    torch.set_num_threads(threads)
+    if warm:
+        from audio_pipeline.model_registry import get_whisper
+        get_whisper()
+
+
+def worker_stats():
+    """
+    Model memory and VAD totals of the calling process.
+    """
+    from audio_pipeline.model_registry import registry
+    from audio_pipeline.vad import vad_totals
+    return {"pid": os.getpid(), "memory": registry.memory_report(), "vad": vad_totals(), "updated": time.time()}
+
+
+def _call_with_stats(fn, *args):
+    return fn(*args), worker_stats()
+
+
+class ASRWorkerPool:
+    def __init__(self, size=ASR_POOL_SIZE, queue_depth=ASR_POOL_QUEUE_DEPTH,
+                 timeout=ASR_JOB_TIMEOUT, threads=ASR_WORKER_THREADS, warm=True):
+        self.size = max(0, int(size))
+        self.queue_depth = max(0, int(queue_depth))
+        self.timeout = timeout
+        self.threads = threads
+        self.warm = warm
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._counters = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "timed_out": 0, "restarts": 0}
+        self._workers = {}  # pid -> latest worker_stats() snapshot
+
+    # ------------------ Lifecycle ------------------
+
+    def start(self):
+        with self._lock:
+            if self.size and self._executor is None:
+                # spawn: forking a process that already holds torch threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.size,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.threads, self.warm),
+                )
+        return self
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _discard(self, broken):
+        """
+        Drops an executor whose worker died; the next submit starts a new one.
+        """
+        with self._lock:
+            if self._executor is not broken:
+                return  # already replaced (or shut down)
+            self._executor = None
+            self._workers.clear()
+            self._counters["restarts"] += 1
+        print("[Warning] ASR worker process died; restarting the pool")
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------ Submission ------------------
+
+    def _acquire(self):
+        with self._lock:
+            if self._inflight >= max(1, self.size) + self.queue_depth:
+                self._counters["rejected"] += 1
+                raise PoolBusyError(f"ASR pool is full ({self._inflight} jobs in flight)")
+            self._inflight += 1
+            self._counters["submitted"] += 1
+
+    def _release(self, fut):
+        with self._lock:
+            self._inflight -= 1
+            failed = fut.cancelled() or fut.exception() is not None
+            self._counters["failed" if failed else "completed"] += 1
+
+    def submit(self, fn, *args):
+        """
+        Submits fn(*args) and returns a concurrent.futures.Future. `fn` must
+        be a module-level function so it can be pickled into the worker.
+        """
+        self._acquire()
+        executor = None
+        try:
+            if self._executor is None and self.size:
+                self.start()
+            executor = self._executor
+            if executor is not None:
+                try:
+                    job = executor.submit(_call_with_stats, fn, *args)
+                except BrokenProcessPool:
+                    # Died since the last job finished: retry on a fresh pool
+                    self._discard(executor)
+                    executor = self.start()._executor
+                    job = executor.submit(_call_with_stats, fn, *args)
+            else:
+                job = Future()
+                threading.Thread(target=_run_into, args=(job, _call_with_stats, (fn, *args)), daemon=True).start()
+        except Exception:
+            with self._lock:
+                self._inflight -= 1
+            raise
+        # The slot is only freed when the job really finishes, even if the
+        # caller has stopped waiting for it
+        job.add_done_callback(self._release)
+        fut = Future()
+        job.add_done_callback(lambda job: self._unwrap(job, fut, executor))
+        return fut
+
+    def _unwrap(self, job, fut, executor):
+        if not job.cancelled() and isinstance(job.exception(), BrokenProcessPool):
+            self._discard(executor)
+        if fut.cancelled():
+            return
+        if job.cancelled():
+            fut.cancel()
+            return
+        if job.exception() is not None:
+            fut.set_exception(job.exception())
+            return
+        result, snapshot = job.result()
+        with self._lock:
+            self._workers[snapshot["pid"]] = snapshot
+        fut.set_result(result)
+
+    async def run(self, fn, *args, timeout=None):
+        """
+        Awaits fn(*args) in the pool. Raises PoolBusyError when the queue is
+        full and asyncio.TimeoutError when the job takes too long.
+        """
+        fut = asyncio.wrap_future(self.submit(fn, *args))
+        try:
+            return await asyncio.wait_for(asyncio.shield(fut), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._counters["timed_out"] += 1
+            raise
+
+    def call(self, fn, *args, timeout=None):
+        """
+        Blocking version of run() for code already running in a thread.
+        """
+        return self.submit(fn, *args).result(timeout=timeout or self.timeout)
+
+    def in_flight(self):
+        """
+        Jobs running or waiting in the pool.
+        """
+        with self._lock:
+            return self._inflight
+
+    def worker_stats(self):
+        """
+        Latest snapshot per worker pid (workers that have not finished a
+        job yet are not listed).
+        """
+        with self._lock:
+            return {pid: dict(snapshot) for pid, snapshot in self._workers.items()}
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "queue_depth": self.queue_depth,
+                "job_timeout_s": self.timeout,
+                "threads_per_worker": self.threads,
+                "in_flight": self._inflight,
+                **self._counters,
+                "workers": {pid: {"vad": w["vad"], "process_rss_mb": w["memory"]["process_rss_mb"]}
+                            for pid, w in self._workers.items()},
+            }
+
+
+def _run_into(fut, fn, args):
+    if not fut.set_running_or_notify_cancel():
+        return
+    try:
+        fut.set_result(fn(*args))
+    except BaseException as e:
+        fut.set_exception(e)
+
+
+asr_pool = ASRWorkerPool()
@@ -1,16 +1,38 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+import asyncio
+import functools
+import os
+import sys
+
+# --- Run ---
+# `python main.py` re-launches itself as `python -m uvicorn main:app`, before
+# anything below is imported: the ASR pool spawns its workers, which re-import
+# __main__, and this file would otherwise load the whole app into each of them
+if __name__ == "__main__":
+    os.execv(sys.executable, [sys.executable, "-m", "uvicorn", "main:app",
+                              "--host", "0.0.0.0", "--port", "8000", "--reload"])
+
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Optional
 
 # --- Import Routers ---
 from api import auth_doctor, auth_patient,emergency, history, teleconsult
-from backend.api import auth_medic
+from backend.api import auth_medic, diagnose
 from routes import care
 
 # --- Import your audio/text pipeline ---
-from audio_pipeline.whisper_asr import transcribe_audio
-from audio_pipeline.normalize import normalize_text
-from ai_models.severity_engine import compute_severity
+from audio_pipeline.audio_io import load_audio
+from audio_pipeline.whisper_asr import (
+    transcribe_audio_async, transcribe_pcm, transcription_cache
+)
+from audio_pipeline.normalize import (
+    normalize_text, translation_batcher, translation_cache,
+    DECODING_PROFILES, ENDPOINT_PROFILES, profile_stats
+)
+from audio_pipeline.model_registry import registry as model_registry
+from audio_pipeline.streaming_asr import StreamingTranscriber
+from audio_pipeline.worker_pool import asr_pool, PoolBusyError
+from ai_models.severity_engine import compute_severity, dispatch_level, extract_symptoms
 from dispatch.doctor_dispatch import dispatch_doctor
 from dispatch.ngo_dispatch import dispatch_ambulance
 
@@ -37,6 +59,7 @@ app.include_router(emergency.router, prefix="/dispatch", tags=["Emergency Dispat
 app.include_router(history.router, prefix="/history", tags=["Medical History"])
 app.include_router(teleconsult.router, prefix="/teleconsult", tags=["Teleconsultation"])
 app.include_router(care.router, prefix="/care", tags=["Care"])
+app.include_router(diagnose.router, prefix="/diagnose", tags=["Diagnosis"])
 
 
 # --- Root Endpoint ---
@@ -44,16 +67,41 @@ app.include_router(care.router, prefix="/care", tags=["Care"])
 def root():
     return {"status": "running", "message": "Welcome to AI4Health Backend", "version": "1.0.0"}
 
+# --- Loaded models and their resident memory ---
+# "api" is this process (translation); Whisper lives in the ASR workers
+@app.get("/models/memory")
+def models_memory():
+    return {
+        "api": model_registry.memory_report(),
+        "asr_workers": {pid: w["memory"] for pid, w in asr_pool.worker_stats().items()}
+    }
+
+# --- Translation batching stats ---
+@app.get("/models/translation/stats")
+def translation_stats():
+    return {
+        "batcher": translation_batcher.stats(),
+        "cache": translation_cache.stats(),
+        "profiles": profile_stats()
+    }
+
+# --- ASR pre-processing stats (VAD totals are per worker, in pool.workers) ---
+@app.get("/models/asr/stats")
+def asr_stats():
+    return {"pool": asr_pool.stats(), "transcription_cache": transcription_cache.stats()}
+
 # --- Audio/Text symptom processing + dispatch ---
 @app.post("/process_symptoms/")
 async def process_symptoms(
     symptoms_text: Optional[str] = Form(None),
-    symptoms_audio: Optional[UploadFile] = File(None)
+    symptoms_audio: Optional[UploadFile] = File(None),
+    decoding_profile: Optional[str] = Form(None)
 ):
     """
     Accepts either:
     1. symptoms_text (any language) OR
     2. symptoms_audio (wav/mp3)
+    Optional decoding_profile ("fast" / "quality") for the translation step.
     
     Returns:
     - Normalized English symptoms
@@ -64,20 +112,36 @@ async def process_symptoms(
     if not symptoms_text and not symptoms_audio:
         raise HTTPException(400, "Provide either symptoms_text or symptoms_audio")
 
-    # 1️⃣ Get raw text
-    if symptoms_audio:
-        try:
-            raw_text = transcribe_audio(symptoms_audio.file)
-        except Exception as e:
-            raise HTTPException(500, f"Audio transcription failed: {str(e)}")
-    else:
-        raw_text = symptoms_text
-
-    # 2️⃣ Normalize / translate to English
-    normalized_text = normalize_text(raw_text)
-
-    # 3️⃣ Compute severity
-    severity_level = compute_severity(normalized_text)  # returns 1-5
+    profile = decoding_profile or ENDPOINT_PROFILES["process_symptoms"]
+    if profile not in DECODING_PROFILES:
+        raise HTTPException(400, f"decoding_profile must be one of {sorted(DECODING_PROFILES)}")
+
+    # 1️⃣ Transcribe in the ASR worker pool and 2️⃣ normalize in a thread, so
+    # this worker keeps serving other requests (e.g. /dispatch/emergency).
+    # Translation stays in this process, where concurrent requests share
+    # one batcher and one cache.
+    try:
+        if symptoms_audio:
+            audio_bytes = await symptoms_audio.read()
+            # Decode here so a re-uploaded recording is answered from the
+            # transcription cache without touching the pool
+            audio = await asyncio.to_thread(load_audio, audio_bytes)
+            result = await transcribe_audio_async(audio, profile=profile)
+            raw_text = result["raw_text"]
+            normalized_text = result["normalized_text"]
+        else:
+            raw_text = symptoms_text
+            normalized_text = await asyncio.to_thread(normalize_text, raw_text, profile)
+    except PoolBusyError as e:
+        raise HTTPException(503, str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(504, "Symptom processing timed out")
+    except Exception as e:
+        raise HTTPException(500, f"Symptom processing failed: {str(e)}")
+
+    # 3️⃣ Compute severity from the symptom phrases in the text
+    severity = compute_severity(extract_symptoms(normalized_text))
+    severity_level = dispatch_level(severity["severity_score"])  # 1-5
 
     # 4️⃣ Dispatch doctor
     doctor_info = dispatch_doctor(normalized_text.split(), severity_level)
@@ -91,21 +155,65 @@ async def process_symptoms(
     return {
         "raw_text": raw_text,
         "normalized_text": normalized_text,
+        "severity_score": severity["severity_score"],
         "severity_level": severity_level,
         "assigned_doctor": doctor_info,
         "ambulance_service": ngo_info
     }
 
+# --- Streaming audio symptom intake ---
+@app.websocket("/process_symptoms/stream")
+async def process_symptoms_stream(websocket: WebSocket):
+    """
+    Streams a recording while it is being made.
+
+    Client sends binary frames of 16 kHz mono 16-bit PCM and a text frame
+    "end" when done. Server replies with {"type": "partial", "text": ...}
+    as audio is transcribed, then one {"type": "final", ...} message with
+    the normalized text and severity.
+    """
+    await websocket.accept()
+    # Whisper runs in the ASR worker pool; feed() blocks only its own thread
+    stream = StreamingTranscriber(transcribe=functools.partial(asr_pool.call, transcribe_pcm))
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes"):
+                partial = await asyncio.to_thread(stream.feed, message["bytes"])
+                if partial is not None:
+                    await websocket.send_json({"type": "partial", "text": partial})
+            elif (message.get("text") or "").strip().lower() in ("end", "stop"):
+                break
+
+        raw_text = await asyncio.to_thread(stream.finish)
+        normalized_text = await asyncio.to_thread(normalize_text, raw_text, ENDPOINT_PROFILES["process_symptoms"])
+        # Score whole phrases ("chest pain"), not single words
+        severity = compute_severity(extract_symptoms(normalized_text))
+        await websocket.send_json({
+            "type": "final",
+            "raw_text": raw_text,
+            "normalized_text": normalized_text,
+            "audio_seconds": round(stream.seconds_received, 2),
+            "severity_score": severity["severity_score"],
+            "severity_level": severity["severity_level"]
+        })
+        await websocket.close()
+    except WebSocketDisconnect:
+        return
+    except Exception as e:
+        await websocket.send_json({"type": "error", "detail": f"Audio transcription failed: {str(e)}"})
+        await websocket.close(code=1011)
+
 # --- Startup/Shutdown ---
 @app.on_event("startup")
 def startup_event():
     print("AI4Health Backend starting up...")
+    asr_pool.start()
 
 @app.on_event("shutdown")
 def shutdown_event():
     print("AI4Health Backend shutting down...")
+    asr_pool.shutdown()
 
-# --- Run ---
-if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,140 @@
+"""
+Small thread-based micro-batcher.
+
+Callers submit single items from any thread and get a Future back. A
+background worker collects whatever arrives within `max_wait_ms` (or until
+`max_batch_size` items are pending under one key), groups them by key and
+hands each group to `process_batch(key, items)` in one call. Each caller's Future is resolved
+with its own element of the returned list.
+"""
+
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    def __init__(self, process_batch, max_batch_size=8, max_wait_ms=10, name="micro-batcher"):
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+
+        # stats
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._waits_ms = deque(maxlen=1000)
+        self._items_total = 0
+        self._batches_total = 0
+
+    # ------------------ Public API ------------------
+
+    def submit(self, item, key=None):
+        """
+        Queue one item and return a Future for its result.
+        """
+        self._ensure_worker()
+        fut = Future()
+        self._queue.put((key, item, fut, time.perf_counter()))
+        return fut
+
+    def submit_many(self, items, key=None):
+        """
+        Queue several items under one key; they are usually picked up in the
+        same batch.
+        """
+        return [self.submit(item, key) for item in items]
+
+    def pending(self):
+        """
+        Number of items waiting for the worker.
+        """
+        return self._queue.qsize()
+
+    def stats(self):
+        with self._stats_lock:
+            waits = sorted(self._waits_ms)
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "pending": self.pending(),
+                "items_total": self._items_total,
+                "batches_total": self._batches_total,
+                "mean_batch_size": round(self._items_total / self._batches_total, 2) if self._batches_total else 0.0,
+                "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+                "queue_wait_ms": {
+                    "mean": round(sum(waits) / len(waits), 2) if waits else 0.0,
+                    "p50": round(waits[len(waits) // 2], 2) if waits else 0.0,
+                    "p95": round(waits[int(len(waits) * 0.95) - 1], 2) if waits else 0.0,
+                    "max": round(waits[-1], 2) if waits else 0.0,
+                },
+            }
+
+    # ------------------ Worker ------------------
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+
+    def _collect(self):
+        """
+        Returns {key: [(item, future, enqueued)]}. The size cap applies per
+        key, so interleaved traffic for several keys still fills batches.
+        """
+        groups = {}
+        deadline = None
+        while True:
+            if deadline is None:
+                key, item, fut, enqueued = self._queue.get()
+                deadline = time.perf_counter() + self.max_wait
+            else:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    key, item, fut, enqueued = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            group = groups.setdefault(key, [])
+            group.append((item, fut, enqueued))
+            if len(group) >= self.max_batch_size:
+                break
+        return groups
+
+    def _run(self):
+        while True:
+            groups = self._collect()
+            started = time.perf_counter()
+
+            for key, entries in groups.items():
+                entries = [e for e in entries if e[1].set_running_or_notify_cancel()]
+                if not entries:
+                    continue
+                self._record(len(entries), [(started - e[2]) * 1000.0 for e in entries])
+                try:
+                    results = self.process_batch(key, [e[0] for e in entries])
+                    if len(results) != len(entries):
+                        raise RuntimeError(f"{self.name}: expected {len(entries)} results, got {len(results)}")
+                except Exception as e:
+                    for _, fut, _ in entries:
+                        fut.set_exception(e)
+                    continue
+                for (_, fut, _), result in zip(entries, results):
+                    fut.set_result(result)
+
+    def _record(self, size, waits_ms):
+        with self._stats_lock:
+            self._batch_sizes[size] += 1
+            self._batches_total += 1
+            self._items_total += size
+            self._waits_ms.extend(waits_ms)
@@ -0,0 +1,132 @@
+"""
+Two-tier key/value cache: a bounded in-memory LRU in front of an optional
+SQLite file that survives restarts.
+
+Values must be JSON-serialisable. Disk hits are promoted into the memory
+tier. Hit/miss counters are kept per tier so the cache can be sized from
+production traffic.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+class TieredCache:
+    def __init__(self, name, max_entries=4096, db_path=None, max_disk_entries=100_000):
+        self.name = name
+        self.max_entries = max(1, int(max_entries))
+        self.max_disk_entries = int(max_disk_entries) if max_disk_entries else None
+
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "writes": 0}
+
+        self._db = None
+        self.db_path = None
+        if db_path:
+            self._open_db(db_path)
+
+    # ------------------ Public API ------------------
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return self._lru[key]
+
+            value = self._disk_get(key)
+            if value is not None:
+                self._counters["disk_hits"] += 1
+                self._memory_put(key, value)
+                return value
+
+            self._counters["misses"] += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._memory_put(key, value)
+            self._disk_put(key, value)
+            self._counters["writes"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM cache")
+                self._db.commit()
+
+    def __len__(self):
+        return len(self._lru)
+
+    def stats(self):
+        with self._lock:
+            c = dict(self._counters)
+            lookups = c["memory_hits"] + c["disk_hits"] + c["misses"]
+            c["lookups"] = lookups
+            c["hit_rate"] = round((c["memory_hits"] + c["disk_hits"]) / lookups, 4) if lookups else 0.0
+            c["memory_entries"] = len(self._lru)
+            c["max_entries"] = self.max_entries
+            c["disk_path"] = self.db_path
+            if self._db is not None:
+                c["disk_entries"] = self._db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            return c
+
+    # ------------------ Memory tier ------------------
+
+    def _memory_put(self, key, value):
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    # ------------------ Disk tier ------------------
+
+    def _open_db(self, db_path):
+        try:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, updated REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS cache_updated ON cache (updated)")
+            self._db.commit()
+            self.db_path = str(db_path)
+        except sqlite3.Error as e:
+            print(f"[Warning] {self.name}: disk cache disabled ({e})")
+            self._db = None
+
+    def _disk_get(self, key):
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            return None
+        return json.loads(row[0]) if row else None
+
+    def _disk_put(self, key, value):
+        if self._db is None:
+            return
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache (key, value, updated) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time()),
+            )
+            # Trim the oldest rows now and then rather than on every write
+            if self.max_disk_entries and self._counters["writes"] % 256 == 0:
+                self._db.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY updated DESC LIMIT -1 OFFSET ?)",
+                    (self.max_disk_entries,),
+                )
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"[Warning] {self.name}: disk cache write failed ({e})")